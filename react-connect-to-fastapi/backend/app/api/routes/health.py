@@ -1,4 +1,15 @@
-from app.schemas.common import HealthResponse
+from typing import Dict
+
+from app.core.db import pool_stats
+from app.core.security import password_pool, token_cache
+from app.schemas.common import (
+    CacheStats,
+    DbPoolStats,
+    HealthResponse,
+    WorkerPoolStats,
+)
+from app.services import item as item_services
+from app.services.user import user_cache
 from fastapi import APIRouter
 
 router = APIRouter()
@@ -10,3 +21,31 @@ async def health_check() -> HealthResponse:
     Health check endpoint
     """
     return HealthResponse(status="ok")
+
+
+@router.get("/caches", response_model=Dict[str, CacheStats])
+async def cache_stats() -> Dict[str, CacheStats]:
+    """
+    Hit/miss counters of the in-process caches of this worker
+    """
+    return {
+        "user": CacheStats(**user_cache.stats()),
+        "token": CacheStats(**token_cache.stats()),
+        "item_listing": CacheStats(**item_services.item_listing_cache.stats()),
+    }
+
+
+@router.get("/password-pool", response_model=WorkerPoolStats)
+async def password_pool_stats() -> WorkerPoolStats:
+    """
+    Queue depth and wait times of the password hashing pool of this worker
+    """
+    return WorkerPoolStats(**password_pool.stats())
+
+
+@router.get("/db-pool", response_model=Dict[str, DbPoolStats])
+async def db_pool_stats() -> Dict[str, DbPoolStats]:
+    """
+    Live statistics of the database connection pools of this worker
+    """
+    return {name: DbPoolStats(**stats) for name, stats in pool_stats().items()}
@@ -1,46 +1,231 @@
-from typing import Optional
+from typing import AsyncIterator, Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, Path, Query, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Header, Path, Query, Request, status
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.responses import Response, StreamingResponse
 
-from app.core.db import get_db
+from app.core.cache import CachedResponse
+from app.core.config import settings
+from app.core.db import get_db, get_read_db, get_read_session_maker, use_read_engine
+from app.core.errors import NotFoundError
+from app.core.serialization import FastJSONResponse, ModelResponse, sparse_model
 from app.deps import CurrentActiveUser
 from app.models.user import User
-from app.schemas.common import PaginatedResponse, PaginationParams
+from app.schemas.common import (
+    CursorPaginatedResponse,
+    PaginatedResponse,
+    PaginationParams,
+)
 from app.schemas.item import (
     BulkDeleteRequest,
     BulkDeleteResponse,
+    BulkItemCreateRequest,
+    BulkItemResponse,
+    BulkItemUpdateRequest,
     ItemCreate,
     ItemDetailResponse,
+    ItemDetailWithOwnerResponse,
+    ItemImportResponse,
     ItemResponse,
     ItemUpdate,
+    ItemWithOwnerResponse,
 )
 from app.services.item import ItemService
+from app.utils.etag import (
+    etag_matches,
+    list_etag,
+    not_modified_response,
+    owned_resource_etag,
+    resource_etag,
+    version_etag,
+)
+from app.utils.export import EXPORT_FIELDS, encode_csv, encode_ndjson
+from app.utils.fields import Fields, sparse_fields
+from app.utils.ndjson import read_lines
+
+router = APIRouter(default_response_class=FastJSONResponse)
 
-router = APIRouter()
+Expand = Optional[Literal["owner"]]
 
 
-@router.get("/", response_model=PaginatedResponse[ItemResponse])
+def expanded_fields(fields: Fields, expand: Expand) -> Fields:
+    """
+    Fields of a response with expansions: the requested ones plus the expanded
+    """
+    if fields is None or expand is None:
+        return fields
+    return (*fields, expand)
+
+
+@router.get(
+    "/",
+    response_model=Union[
+        PaginatedResponse[ItemResponse],
+        CursorPaginatedResponse[ItemResponse],
+        PaginatedResponse[ItemWithOwnerResponse],
+        CursorPaginatedResponse[ItemWithOwnerResponse],
+    ],
+)
 async def list_items(
+    request: Request,
     pagination: PaginationParams = Depends(),
     owner_id: Optional[int] = Query(None, description="Filter items by owner"),
-    db: AsyncSession = Depends(get_db),
-) -> PaginatedResponse:
+    fields: Fields = Depends(sparse_fields(ItemResponse)),
+    expand: Expand = Query(None, description="Include the owner of every item"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
     """
     List items with pagination and filtering
+
+    Pass mode=cursor (or a cursor from a previous page) to use keyset pagination.
+    The ETag fingerprints the page, a matching If-None-Match returns 304.
+    Page-based listings are served from a per-owner cache of serialized pages.
+    With fields, only those columns are loaded and returned. With expand=owner,
+    the owners of a page are loaded with a single extra query.
     """
     item_service = ItemService(db)
-    items, total = await item_service.get_items(pagination, owner_id)
+    expand_owner = expand == "owner"
+    item_model = sparse_model(
+        ItemWithOwnerResponse if expand_owner else ItemResponse,
+        expanded_fields(fields, expand),
+    )
+
+    if pagination.use_cursor:
+        items, next_cursor = await item_service.get_items_by_cursor(
+            pagination, owner_id, fields, expand_owner
+        )
+        etag = list_etag(items, next_cursor, with_owner=expand_owner)
+        if etag_matches(if_none_match, etag):
+            return not_modified_response(etag)
+
+        return ModelResponse(
+            {
+                "items": items,
+                "limit": pagination.limit,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+            },
+            CursorPaginatedResponse[item_model],
+            headers={"ETag": etag},
+        )
+
+    cached, cache_version = item_service.get_cached_listing(
+        pagination, owner_id, fields, expand_owner
+    )
+    # Clients routed to the primary need their own writes, not a cached page
+    if cached is not None and use_read_engine(request):
+        if etag_matches(if_none_match, cached.etag):
+            return not_modified_response(cached.etag)
+        return Response(
+            cached.body, media_type="application/json", headers={"ETag": cached.etag}
+        )
+
+    items, total = await item_service.get_items(
+        pagination, owner_id, fields, expand_owner
+    )
 
     # Calculate total pages
     pages = (total + pagination.limit - 1) // pagination.limit
 
-    return PaginatedResponse(
-        items=items,
-        total=total,
-        page=pagination.page,
-        limit=pagination.limit,
-        pages=pages,
+    etag = list_etag(items, total, with_owner=expand_owner)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
+    response = ModelResponse(
+        {
+            "items": items,
+            "total": total,
+            "page": pagination.page,
+            "limit": pagination.limit,
+            "pages": pages,
+        },
+        PaginatedResponse[item_model],
+        headers={"ETag": etag},
+    )
+    item_service.cache_listing(
+        pagination,
+        owner_id,
+        CachedResponse(response.body, etag),
+        cache_version,
+        fields,
+        expand_owner,
+    )
+
+    return response
+
+
+@router.get("/search", response_model=CursorPaginatedResponse[ItemResponse])
+async def search_items(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    limit: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    owner_id: Optional[int] = Query(None, description="Only search this owner"),
+    db: AsyncSession = Depends(get_read_db),
+) -> ModelResponse:
+    """
+    Search item titles and descriptions
+
+    Returns items containing all words of q, best matches first, with keyset
+    pagination through next_cursor.
+    """
+    item_service = ItemService(db)
+    items, next_cursor = await item_service.search(q, limit, cursor, owner_id)
+
+    return ModelResponse(
+        {
+            "items": items,
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+        },
+        CursorPaginatedResponse[ItemResponse],
+    )
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_items(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Export format"),
+    owner_id: Optional[int] = Query(None, description="Filter items by owner"),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_read_session_maker),
+) -> StreamingResponse:
+    """
+    Export all (or one owner's) items as NDJSON or CSV in id order
+
+    Rows are streamed from the database in batches and each batch is sent as
+    soon as it is encoded, so memory use does not grow with the export size.
+    """
+
+    async def body() -> AsyncIterator[bytes]:
+        if format == "csv":
+            yield encode_csv([EXPORT_FIELDS])
+
+        # The streaming body outlives the request's dependencies, so it needs a
+        # session of its own
+        async with session_maker() as session:
+            batches = ItemService(session).stream_rows(
+                EXPORT_FIELDS, settings.EXPORT_BATCH_SIZE, owner_id
+            )
+            async for batch in batches:
+                if await request.is_disconnected():
+                    logger.info("Client disconnected, export stopped")
+                    await batches.aclose()
+                    return
+
+                if format == "csv":
+                    yield encode_csv(batch)
+                else:
+                    yield encode_ndjson(row._mapping for row in batch)
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="items.{format}"'},
     )
 
 
@@ -49,23 +234,127 @@ async def create_item(
     item_data: ItemCreate,
     current_user: CurrentActiveUser,
     db: AsyncSession = Depends(get_db),
-) -> ItemResponse:
+) -> ModelResponse:
     """
     Create a new item
     """
     item_service = ItemService(db)
-    return await item_service.create(item_data, current_user.id)
+    item = await item_service.create(item_data, current_user.id)
 
+    return ModelResponse(item, ItemResponse, status_code=status.HTTP_201_CREATED)
 
-@router.get("/{item_id}", response_model=ItemDetailResponse)
+
+@router.post(
+    "/bulk", response_model=BulkItemResponse, status_code=status.HTTP_201_CREATED
+)
+async def bulk_create_items(
+    request: BulkItemCreateRequest,
+    current_user: CurrentActiveUser,
+    db: AsyncSession = Depends(get_db),
+) -> BulkItemResponse:
+    """
+    Create multiple items in a single transaction
+
+    Returns one result per entry, in request order
+    """
+    item_service = ItemService(db)
+    results = await item_service.bulk_create(request.items, current_user.id)
+
+    return BulkItemResponse(results=results)
+
+
+@router.post(
+    "/import",
+    response_model=ItemImportResponse,
+    status_code=status.HTTP_200_OK,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_items(
+    request: Request,
+    current_user: CurrentActiveUser,
+    db: AsyncSession = Depends(get_db),
+) -> ItemImportResponse:
+    """
+    Create items from an NDJSON body with one ItemCreate object per line
+
+    The body is parsed while it is being uploaded and inserted in batches.
+    Invalid lines are skipped and reported with their line numbers.
+    """
+    # Release the connection used to authenticate while the body uploads
+    await db.commit()
+
+    item_service = ItemService(db)
+    lines = read_lines(request.stream(), settings.IMPORT_MAX_LINE_BYTES)
+
+    return await item_service.import_items(lines, current_user.id)
+
+
+@router.patch("/bulk", response_model=BulkItemResponse, status_code=status.HTTP_200_OK)
+async def bulk_update_items(
+    request: BulkItemUpdateRequest,
+    current_user: CurrentActiveUser,
+    db: AsyncSession = Depends(get_db),
+) -> BulkItemResponse:
+    """
+    Update multiple items in a single transaction
+
+    Returns one result per entry, in request order
+    """
+    item_service = ItemService(db)
+    results = await item_service.bulk_update(request.items, current_user)
+
+    return BulkItemResponse(results=results)
+
+
+@router.get(
+    "/{item_id}",
+    response_model=Union[ItemDetailResponse, ItemDetailWithOwnerResponse],
+)
 async def get_item(
-    item_id: int = Path(..., ge=1), db: AsyncSession = Depends(get_db)
-) -> ItemDetailResponse:
+    item_id: int = Path(..., ge=1),
+    fields: Fields = Depends(sparse_fields(ItemDetailResponse)),
+    expand: Expand = Query(None, description="Include the owner of the item"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
     """
-    Get a specific item by id
+    Get a specific item by id, or only the given fields of it
+
+    A matching If-None-Match returns 304 after reading only the item's version.
+    With expand=owner the ETag also covers the owner, so the item is loaded first.
     """
     item_service = ItemService(db)
-    return await item_service.get_by_id(item_id)
+    expand_owner = expand == "owner"
+
+    if if_none_match and not expand_owner:
+        version = await item_service.get_version(item_id)
+        if version and etag_matches(if_none_match, version_etag(*version)):
+            return not_modified_response(version_etag(*version))
+
+    item = await item_service.get_by_id(item_id, fields, expand_owner)
+    if not item:
+        raise NotFoundError("Item", item_id)
+
+    if not expand_owner:
+        etag = resource_etag(item)
+    else:
+        etag = owned_resource_etag(item)
+        if etag_matches(if_none_match, etag):
+            return not_modified_response(etag)
+
+    return ModelResponse(
+        item,
+        sparse_model(
+            ItemDetailWithOwnerResponse if expand_owner else ItemDetailResponse,
+            expanded_fields(fields, expand),
+        ),
+        headers={"ETag": etag},
+    )
 
 
 @router.put("/{item_id}", response_model=ItemDetailResponse)
@@ -73,13 +362,20 @@ async def update_item(
     item_data: ItemUpdate,
     current_user: CurrentActiveUser,
     item_id: int = Path(..., ge=1),
+    if_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-) -> ItemDetailResponse:
+) -> ModelResponse:
     """
     Update an item
+
+    Send the item's ETag as If-Match to reject the update if it changed meanwhile
     """
     item_service = ItemService(db)
-    return await item_service.update(item_id, item_data, current_user)
+    item = await item_service.update(item_id, item_data, current_user, if_match)
+
+    return ModelResponse(
+        item, ItemDetailResponse, headers={"ETag": resource_etag(item)}
+    )
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,53 +1,81 @@
-from fastapi import APIRouter, Depends, Path, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Path, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response
 
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
+from app.core.errors import NotFoundError
+from app.core.serialization import FastJSONResponse, ModelResponse, sparse_model
 from app.deps import CurrentActiveUser, CurrentSuperUser
-from app.models.user import User
 from app.schemas.user import UserAdminResponse, UserResponse, UserUpdate
 from app.services.user import UserService
+from app.utils.etag import etag_matches, not_modified_response, resource_etag
+from app.utils.fields import Fields, sparse_fields
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(current_user: CurrentActiveUser) -> User:
+async def get_current_user(
+    current_user: CurrentActiveUser,
+    fields: Fields = Depends(sparse_fields(UserResponse)),
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
     """
-    Get current user
+    Get current user, or only the given fields of it
+
+    A matching If-None-Match returns 304 without serializing the user
     """
-    return current_user
+    etag = resource_etag(current_user)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
+    return ModelResponse(
+        current_user, sparse_model(UserResponse, fields), headers={"ETag": etag}
+    )
 
 
 @router.put("/me", response_model=UserResponse)
 async def update_current_user(
     user_data: UserUpdate,
     current_user: CurrentActiveUser,
+    if_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> ModelResponse:
     """
     Update current user
+
+    Send the user's ETag as If-Match to reject the update if it changed meanwhile
     """
     user_service = UserService(db)
-    return await user_service.update(current_user.id, user_data)
+    user = await user_service.update(current_user.id, user_data, if_match)
+
+    return ModelResponse(user, UserResponse, headers={"ETag": resource_etag(user)})
 
 
 @router.get("/{user_id}", response_model=UserAdminResponse)
 async def get_user_by_id(
+    _: CurrentSuperUser,
     user_id: int = Path(..., ge=1),
-    _: User = Depends(CurrentSuperUser),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+    fields: Fields = Depends(sparse_fields(UserAdminResponse)),
+    db: AsyncSession = Depends(get_read_db),
+) -> ModelResponse:
     """
-    Get a specific user by id, admin only
+    Get a specific user by id, or only the given fields of it, admin only
     """
     user_service = UserService(db)
-    return await user_service.get_by_id(user_id)
+    user = await user_service.get_by_id(user_id, fields)
+    if not user:
+        raise NotFoundError("User", user_id)
+
+    return ModelResponse(user, sparse_model(UserAdminResponse, fields))
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
+    _: CurrentSuperUser,
     user_id: int = Path(..., ge=1),
-    _: User = Depends(CurrentSuperUser),
     db: AsyncSession = Depends(get_db),
 ) -> None:
     """
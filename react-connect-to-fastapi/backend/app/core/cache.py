@@ -0,0 +1,314 @@
+import mmap
+import os
+import random
+import struct
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Hashable,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from app.core.config import settings
+
+V = TypeVar("V")
+EntryKey = Tuple[Hashable, Hashable]
+
+GENERATION = struct.Struct("<Q")
+
+
+class SharedGenerations:
+    """
+    Invalidation generations shared by the worker processes through a file
+
+    Keys hash onto fixed 8-byte slots of a memory-mapped file. Invalidating a
+    key writes a fresh random value to its slot, so concurrent invalidations
+    never cancel out and no locking is needed. Caches compare the generation an
+    entry was stored with against the current one; keys sharing a slot only
+    cause extra misses.
+    """
+
+    def __init__(self, path: str, slots: int = 4096):
+        self.slots = slots
+        size = slots * GENERATION.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def _offset(self, key: Hashable) -> int:
+        # crc32 rather than hash(), which is randomized per process for strings
+        slot = zlib.crc32(repr(key).encode()) % self.slots
+        return slot * GENERATION.size
+
+    def get(self, key: Hashable) -> int:
+        return GENERATION.unpack_from(self._map, self._offset(key))[0]
+
+    def bump(self, key: Hashable) -> None:
+        GENERATION.pack_into(self._map, self._offset(key), random.getrandbits(64))
+
+
+def shared_generations(name: str) -> Optional[SharedGenerations]:
+    """
+    Generations of the named cache in CACHE_INVALIDATION_DIR, if configured
+    """
+    directory = settings.CACHE_INVALIDATION_DIR
+    if not directory:
+        return None
+
+    os.makedirs(directory, exist_ok=True)
+    return SharedGenerations(os.path.join(directory, f"{name}.gen"))
+
+
+class TTLCache(Generic[V]):
+    """
+    Bounded in-process LRU cache whose entries expire after a time-to-live
+
+    Intended for per-worker caching of hot lookups, so every write path must
+    invalidate the entries it affects. With shared generations, invalidations
+    also apply to the caches of the other worker processes.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        generations: Optional[SharedGenerations] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generations = generations
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, int, V]]" = OrderedDict()
+
+    def generation(self, key: Hashable) -> int:
+        """
+        Current generation of a key, to capture before loading its value
+        """
+        return self.generations.get(key) if self.generations else 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """
+        Return the cached value for key, or None if missing, expired or stale
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, generation, value = entry
+        if expires_at <= time.monotonic() or generation != self.generation(key):
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: V,
+        ttl: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Store a value, evicting the least recently used entry when full
+
+        A value loaded before the key was invalidated (its generation is no
+        longer current) is not stored.
+        """
+        if self.max_size <= 0:
+            return
+
+        current = self.generation(key)
+        if generation is not None and generation != current:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, current, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Drop a single entry, in every worker when generations are shared
+        """
+        self._data.pop(key, None)
+        if self.generations:
+            self.generations.bump(key)
+
+    def clear(self) -> None:
+        """
+        Drop every entry
+        """
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters and current occupancy
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "max_size": self.max_size,
+        }
+
+
+class CachedResponse(NamedTuple):
+    """
+    Serialized response body together with its ETag
+    """
+
+    body: bytes
+    etag: str
+
+
+class ResponseCache(ABC):
+    """
+    Storage backend for serialized responses, grouped in invalidation namespaces
+
+    Writers bump a namespace's version when invalidating it; readers capture the
+    version before computing a response so a result computed from data that was
+    modified meanwhile is never stored.
+    """
+
+    @abstractmethod
+    def get(self, namespace: Hashable, key: Hashable) -> Optional[CachedResponse]:
+        """Return the cached response, or None"""
+
+    @abstractmethod
+    def version(self, namespace: Hashable) -> int:
+        """Current version of a namespace"""
+
+    @abstractmethod
+    def set(
+        self, namespace: Hashable, key: Hashable, value: CachedResponse, version: int
+    ) -> None:
+        """Store a response unless the namespace moved past version"""
+
+    @abstractmethod
+    def invalidate(self, namespace: Hashable) -> None:
+        """Drop every entry of a namespace"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy"""
+
+
+class InMemoryResponseCache(ResponseCache):
+    """
+    Per-worker response cache with LRU eviction, a size budget in bytes and TTL
+
+    With shared generations, namespace versions live in the shared file, so an
+    invalidation in one worker also retires the entries of the others.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        generations: Optional[SharedGenerations] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generations = generations
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._data: "OrderedDict[EntryKey, Tuple[float, int, CachedResponse]]" = (
+            OrderedDict()
+        )
+        self._namespaces: Dict[Hashable, Set[Hashable]] = {}
+        self._versions: Dict[Hashable, int] = {}
+
+    def get(self, namespace: Hashable, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._data.get((namespace, key))
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, version, value = entry
+        if expires_at <= time.monotonic() or version != self.version(namespace):
+            self._remove((namespace, key))
+            self.misses += 1
+            return None
+
+        self._data.move_to_end((namespace, key))
+        self.hits += 1
+        return value
+
+    def version(self, namespace: Hashable) -> int:
+        if self.generations:
+            return self.generations.get(namespace)
+        return self._versions.get(namespace, 0)
+
+    def set(
+        self, namespace: Hashable, key: Hashable, value: CachedResponse, version: int
+    ) -> None:
+        entry_size = len(value.body)
+        if entry_size > self.max_bytes or version != self.version(namespace):
+            return
+
+        self._remove((namespace, key))
+        self._data[(namespace, key)] = (time.monotonic() + self.ttl, version, value)
+        self._namespaces.setdefault(namespace, set()).add(key)
+        self.size += entry_size
+
+        # Evict least recently used entries until back within budget
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._data)))
+
+    def invalidate(self, namespace: Hashable) -> None:
+        if self.generations:
+            self.generations.bump(namespace)
+        else:
+            self._versions[namespace] = self.version(namespace) + 1
+        for key in list(self._namespaces.get(namespace, ())):
+            self._remove((namespace, key))
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._namespaces.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": self.size,
+            "max_size": self.max_bytes,
+        }
+
+    def _remove(self, entry_key: EntryKey) -> None:
+        entry = self._data.pop(entry_key, None)
+        if entry is None:
+            return
+
+        self.size -= len(entry[-1].body)
+        namespace, key = entry_key
+        keys = self._namespaces[namespace]
+        keys.discard(key)
+        if not keys:
+            del self._namespaces[namespace]
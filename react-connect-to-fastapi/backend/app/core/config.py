@@ -1,19 +1,57 @@
 import sys
-from typing import List, Optional, Union
+from typing import List, Literal, Optional, Union
 
 from loguru import logger
-from pydantic import AnyHttpUrl, field_validator
+from pydantic import AnyHttpUrl, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+_logging_configured = False
+
 
 # Configure loguru
 def setup_logging():
-    """Setup logging configuration"""
+    """
+    Setup logging configuration, once per process
+
+    Called when the application is created rather than at import time, and
+    file sinks only open their file on the first record.
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+
     logger.remove()  # Remove default logger
+
+    if settings.LOG_MODE == "prod":
+        # JSON records written from a background thread, so request handlers never
+        # block on terminal or file I/O, with plain (cheap) traceback rendering
+        logger.add(
+            sys.stderr,
+            level=settings.LOG_LEVEL,
+            serialize=True,
+            enqueue=True,
+            backtrace=False,
+            diagnose=False,
+        )
+        logger.add(
+            "logs/app.log",
+            rotation="10 MB",
+            retention="10 days",
+            level=settings.LOG_LEVEL,
+            compression="zip",
+            delay=True,
+            serialize=True,
+            enqueue=True,
+            backtrace=False,
+            diagnose=False,
+        )
+        return
+
     logger.add(
         sys.stderr,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        level="INFO",
+        level=settings.LOG_LEVEL,
         colorize=True,
     )
     logger.add(
@@ -22,6 +60,7 @@ def setup_logging():
         retention="10 days",
         level="DEBUG",
         compression="zip",
+        delay=True,
         backtrace=True,
         diagnose=True,
     )
@@ -39,9 +78,58 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change_this_in_production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    PASSWORD_HASH_WORKERS: int = 4  # Threads dedicated to bcrypt
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Waiting hashes before rejecting with 503
+
+    # CACHING
+    USER_CACHE_SIZE: int = 1024  # 0 disables the authenticated user cache
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    TOKEN_CACHE_SIZE: int = 4096  # 0 disables the verified token cache
+    ITEM_LISTING_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # 0 disables the cache
+    ITEM_LISTING_CACHE_TTL_SECONDS: float = 5.0
+    # Directory through which worker processes see each other's cache
+    # invalidations (set by serve --prod with several workers). Without it, a
+    # worker only drops its own entries and the others serve them until the TTL
+    CACHE_INVALIDATION_DIR: Optional[str] = None
 
     # DATABASE
     DATABASE_URL: str = "sqlite+aiosqlite:///./app.db"
+    BULK_CHUNK_SIZE: int = 500  # Ids bound per statement in bulk operations
+    BULK_WRITE_MAX_ITEMS: int = 1000  # Entries accepted per bulk create/update
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched and encoded per export chunk
+    IMPORT_BATCH_SIZE: int = 1000  # Rows inserted per import transaction
+    IMPORT_MAX_LINE_BYTES: int = 64 * 1024  # Longer import lines are rejected
+    IMPORT_MAX_ERRORS: int = 100  # Errors reported in an import summary
+
+    # Connection pool of the primary; SQLite files skip the overflow and add
+    # SQLITE_READ_POOL_SIZE read-only connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # Seconds, -1 never recycles
+    # Ping connections idle for longer than this on checkout, -1 never pings
+    DB_PRE_PING_IDLE_SECONDS: float = 60.0
+
+    # SQL instrumentation: statements slower than this are logged with their
+    # parameters, and in dev mode a statement repeated more than N times within
+    # one request is reported as a likely N+1 query
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    N_PLUS_ONE_THRESHOLD: int = 10
+
+    # SQLite profile, applied on connect when DATABASE_URL is a SQLite file
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -64000  # Negative values are KiB, so 64 MB
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_READ_POOL_SIZE: int = 8  # Read-only connections used by GET routes
+
+    # Optional read engine (replica or read-only snapshot) for GET routes,
+    # defaults to read-only connections to DATABASE_URL
+    READ_DATABASE_URL: Optional[str] = None
+    # Clients that wrote within this window read from the primary
+    READ_AFTER_WRITE_SECONDS: float = 5.0
 
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
@@ -59,12 +147,34 @@ class Settings(BaseSettings):
     DOCS_URL: Optional[str] = "/docs"
     REDOC_URL: Optional[str] = "/redoc"
 
+    # Production server (run.py serve --prod)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    WEB_CONCURRENCY: Optional[int] = None  # Worker processes, defaults to CPU cores
+    SERVER_BACKLOG: int = 2048
+    # Longer than the idle timeout of common load balancers, so they never reuse
+    # a connection the server is closing
+    SERVER_KEEPALIVE_SECONDS: int = 65
+    # Workers are replaced after this many requests (plus a random jitter, so
+    # they do not all restart at once) to contain memory growth
+    SERVER_MAX_REQUESTS: Optional[int] = 10000
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    # Off in workers started by serve --prod, which initializes the database once
+    INIT_DB_ON_STARTUP: bool = True
+
+    # Metrics
+    # Shared directory for merging /metrics across workers, unset for one process
+    METRICS_MULTIPROC_DIR: Optional[str] = None
+    METRICS_FLUSH_SECONDS: float = 5.0
+
     # Logging
     LOG_LEVEL: str = "INFO"
+    LOG_MODE: Literal["dev", "prod"] = "dev"  # prod: enqueued JSON sinks
+    # Fraction of successful requests that get start/complete log lines,
+    # failed requests and responses with status >= 400 are always logged
+    LOG_SAMPLE_RATE: float = Field(1.0, ge=0.0, le=1.0)
 
 
 # Initialize settings
 settings = Settings()
-
-# Setup logging
-setup_logging()
@@ -1,26 +1,231 @@
-from typing import AsyncGenerator
+import time
+from typing import Any, AsyncGenerator, Dict
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Request
+from sqlalchemy import event, exc
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+from app.core.metrics import registry
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    future=True,
-    pool_pre_ping=True,
-)
+def is_sqlite_file(url: URL) -> bool:
+    """
+    Whether a database URL points to an on-disk SQLite database
+    """
+    return url.get_backend_name() == "sqlite" and url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def sqlite_read_only_url(url: URL) -> URL:
+    """
+    Turn a SQLite file URL into a URI that opens the file read-only
+    """
+    return url.set(
+        database=f"file:{url.database}",
+        query={**url.query, "mode": "ro", "uri": "true"},
+    )
+
+
+def apply_sqlite_profile(engine: AsyncEngine, read_only: bool = False) -> None:
+    """
+    Apply the configured SQLite pragmas to every new connection of an engine
+
+    journal_mode and synchronous concern writing, so they are only set on the
+    writer; WAL is persistent in the database file and readers pick it up.
+    """
+    pragmas: Dict[str, Any] = {
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+    if read_only:
+        pragmas["query_only"] = "ON"
+    else:
+        pragmas["journal_mode"] = settings.SQLITE_JOURNAL_MODE
+        pragmas["synchronous"] = settings.SQLITE_SYNCHRONOUS
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+# Cookie holding the epoch until which a client that wrote reads from the primary
+READ_AFTER_WRITE_COOKIE = "read_primary_until"
+# Header a client can send to force a read from the primary
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records checkout wait times and checkout timeouts
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Live occupancy plus checkout wait and timeout counters
+        """
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg": self.wait_total / self.checkouts if self.checkouts else 0.0,
+            "wait_max": self.wait_max,
+        }
+
+
+def apply_idle_pre_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    """
+    Ping connections on checkout only after they sat idle in the pool
+
+    Replaces pool_pre_ping, which costs a round trip on every checkout. A failed
+    ping raises DisconnectionError so the pool retries with a fresh connection.
+    """
+    if idle_seconds < 0:
+        return
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def record_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def ping_idle_connection(
+        dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+    ) -> None:
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            raise exc.DisconnectionError() from e
+
+
+def create_engine(
+    url: URL,
+    pool_size: int,
+    max_overflow: int,
+    sqlite: bool = False,
+    read_only: bool = False,
+) -> AsyncEngine:
+    """
+    Create an engine with the configured, instrumented connection pool
+    """
+    new_engine = create_async_engine(
+        sqlite_read_only_url(url) if read_only else url,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    apply_idle_pre_ping(new_engine, settings.DB_PRE_PING_IDLE_SECONDS)
+    instrument_engine(new_engine)
+    if sqlite:
+        apply_sqlite_profile(new_engine, read_only=read_only)
+    return new_engine
+
+
+database_url = make_url(settings.DATABASE_URL)
+
+if is_sqlite_file(database_url):
+    # WAL keeps readers off the write lock and busy_timeout makes concurrent
+    # writers wait for it, so a session that only reads (e.g. while bcrypt runs)
+    # blocks no one. Without overflow, most waiting happens in the FIFO pool
+    # queue rather than in SQLite's busy handler, which is not fair
+    engine = create_engine(
+        database_url, pool_size=settings.DB_POOL_SIZE, max_overflow=0, sqlite=True
+    )
+else:
+    engine = create_engine(
+        database_url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+
+if settings.READ_DATABASE_URL:
+    # Dedicated read engine, e.g. a replica or a read-only snapshot file
+    read_database_url = make_url(settings.READ_DATABASE_URL)
+    if is_sqlite_file(read_database_url):
+        read_engine = create_engine(
+            read_database_url,
+            pool_size=settings.SQLITE_READ_POOL_SIZE,
+            max_overflow=0,
+            sqlite=True,
+            read_only=True,
+        )
+    else:
+        read_engine = create_engine(
+            read_database_url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+elif is_sqlite_file(database_url):
+    # Read-only connections scale reads across connections alongside the writer
+    read_engine = create_engine(
+        database_url,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+        sqlite=True,
+        read_only=True,
+    )
+else:
+    read_engine = engine
 
 async_session_maker = async_sessionmaker(
     engine, expire_on_commit=False, autoflush=False
 )
 
+read_session_maker = async_sessionmaker(
+    read_engine, expire_on_commit=False, autoflush=False
+)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -31,3 +236,99 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+
+def use_read_engine(request: Request) -> bool:
+    """
+    Routing rule deciding whether a request may read from the read engine
+
+    Unsafe methods, clients asking for primary consistency and clients that
+    wrote within the read-after-write window stay on the primary.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return False
+
+    if request.headers.get(READ_CONSISTENCY_HEADER, "").lower() == "primary":
+        return False
+
+    read_primary_until = request.cookies.get(READ_AFTER_WRITE_COOKIE)
+    if read_primary_until:
+        try:
+            if float(read_primary_until) > time.time():
+                return False
+        except ValueError:
+            pass
+
+    return True
+
+
+def get_read_session_maker(request: Request) -> async_sessionmaker[AsyncSession]:
+    """
+    Dependency function returning the session factory for read-only routes
+
+    For streaming responses, which outlive the request's yield dependencies and
+    therefore open their own session. Routed like get_read_db.
+    """
+    return read_session_maker if use_read_engine(request) else async_session_maker
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function that yields db sessions for read-only routes
+
+    Sessions come from the read engine unless use_read_engine routes the request
+    to the primary.
+    """
+    async with get_read_session_maker(request)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Live statistics of the primary and read connection pools
+    """
+    stats = {"primary": engine.pool.stats()}
+    if read_engine is not engine:
+        stats["read"] = read_engine.pool.stats()
+    return stats
+
+
+DB_POOL_CONNECTIONS = registry.gauge(
+    "db_pool_connections", "Connections per pool and state", ("pool", "state")
+)
+DB_POOL_CHECKOUTS = registry.counter(
+    "db_pool_checkouts_total", "Connection checkouts", ("pool",)
+)
+DB_POOL_CHECKOUT_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts_total", "Connection checkouts that timed out", ("pool",)
+)
+DB_POOL_CHECKOUT_WAIT = registry.counter(
+    "db_pool_checkout_wait_seconds_total", "Time spent waiting for checkouts", ("pool",)
+)
+
+
+def collect_pool_metrics() -> None:
+    """
+    Mirror live pool statistics into the metrics registry
+    """
+    for name, stats in pool_stats().items():
+        for state in ("size", "checked_out", "checked_in", "overflow"):
+            DB_POOL_CONNECTIONS.set(stats[state], name, state)
+        DB_POOL_CHECKOUTS.set(stats["checkouts"], name)
+        DB_POOL_CHECKOUT_TIMEOUTS.set(stats["timeouts"], name)
+        DB_POOL_CHECKOUT_WAIT.set(stats["wait_avg"] * stats["checkouts"], name)
+
+
+registry.add_collector(collect_pool_metrics)
+
+
+async def dispose_engines() -> None:
+    """
+    Close all pooled connections
+    """
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
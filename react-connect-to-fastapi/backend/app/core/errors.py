@@ -7,6 +7,8 @@ from loguru import logger
 from pydantic import BaseModel
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.core.metrics import APP_EXCEPTIONS
+
 
 class ErrorResponse(BaseModel):
     error: str
@@ -64,6 +66,19 @@ class PermissionDeniedError(AppException):
         )
 
 
+class BadRequestError(AppException):
+    """
+    Malformed or unusable request input errors
+    """
+
+    def __init__(self, message: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error_code="bad_request",
+            message=message,
+        )
+
+
 class ConflictError(AppException):
     """
     Resource conflict errors (e.g., unique constraint violation)
@@ -77,6 +92,32 @@ class ConflictError(AppException):
         )
 
 
+class PreconditionFailedError(AppException):
+    """
+    Conditional request errors (e.g., If-Match no longer matching)
+    """
+
+    def __init__(self, message: str = "Resource has been modified"):
+        super().__init__(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            error_code="precondition_failed",
+            message=message,
+        )
+
+
+class ServiceUnavailableError(AppException):
+    """
+    Temporary overload errors, the client may retry later
+    """
+
+    def __init__(self, message: str = "Service temporarily unavailable"):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code="service_unavailable",
+            message=message,
+        )
+
+
 def make_serializable(obj: Any) -> Any:
     """
     Recursively convert an object to a JSON serializable type.
@@ -104,6 +145,7 @@ def setup_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(AppException)
     async def handle_app_exception(request: Request, exc: AppException) -> JSONResponse:
         logger.warning(f"Application exception: {exc.error_code} - {exc.message}")
+        APP_EXCEPTIONS.inc(exc.error_code)
         return JSONResponse(
             status_code=exc.status_code,
             content=ErrorResponse(
@@ -122,6 +164,7 @@ def setup_exception_handlers(app: FastAPI) -> None:
         errors = make_serializable(raw_errors)
 
         logger.warning(f"Validation error: {errors}")
+        APP_EXCEPTIONS.inc("validation_error")
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             content=ErrorResponse(
@@ -135,6 +178,7 @@ def setup_exception_handlers(app: FastAPI) -> None:
     async def handle_db_error(request: Request, exc: SQLAlchemyError) -> JSONResponse:
         logger.error(f"Database error: {str(exc)}")
         logger.exception(exc)
+        APP_EXCEPTIONS.inc("database_error")
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content=ErrorResponse(
@@ -146,6 +190,7 @@ def setup_exception_handlers(app: FastAPI) -> None:
     async def handle_generic_error(request: Request, exc: Exception) -> JSONResponse:
         logger.error(f"Unhandled exception: {str(exc)}")
         logger.exception(exc)
+        APP_EXCEPTIONS.inc("server_error")
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content=ErrorResponse(
@@ -1,10 +1,18 @@
 import asyncio
 
 from loguru import logger
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncEngine
 
-from app.core.db import Base, engine
-from app.core.security import get_password_hash
+from app.core.db import Base, dispose_engines, engine
+from app.core.migrations import (
+    get_stored_fingerprint,
+    locked_transaction,
+    run_migrations,
+    schema_fingerprint,
+    store_fingerprint,
+)
+from app.core.security import get_password_hash_async
 from app.models.user import User
 
 
@@ -14,7 +22,7 @@ async def create_tables(engine: AsyncEngine) -> None:
     """
     logger.info("Creating database tables")
 
-    async with engine.begin() as conn:
+    async with locked_transaction(engine) as conn:
         await conn.run_sync(Base.metadata.create_all)
 
     logger.info("Database tables created")
@@ -44,29 +52,47 @@ async def create_initial_superuser() -> None:
         superuser = User(
             email="admin@example.com",
             username="admin",
-            hashed_password=get_password_hash("Admin123!"),
+            hashed_password=await get_password_hash_async("Admin123!"),
             full_name="Admin User",
             is_active=True,
             is_superuser=True,
         )
 
         session.add(superuser)
-        await session.commit()
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Another worker initializing concurrently created it first
+            logger.info("Superuser already exists")
+            return
 
         logger.info("Superuser created")
 
 
 async def init_db() -> None:
     """
-    Initialize database
+    Initialize database, once per schema version
+
+    Workers starting against a database that was already initialized for the
+    current models and migrations only pay for one fingerprint lookup.
     """
     try:
+        fingerprint = schema_fingerprint(engine.dialect)
+        if await get_stored_fingerprint(engine) == fingerprint:
+            logger.info("Database already initialized for this schema version")
+            return
+
         # Create tables
         await create_tables(engine)
 
+        # Bring existing databases up to date
+        await run_migrations(engine)
+
         # Create superuser
         await create_initial_superuser()
 
+        await store_fingerprint(engine, fingerprint)
+
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
         logger.exception(e)
@@ -77,7 +103,14 @@ def run_init_db() -> None:
     """
     Run database initialization as a script
     """
-    asyncio.run(init_db())
+
+    async def main() -> None:
+        try:
+            await init_db()
+        finally:
+            await dispose_engines()
+
+    asyncio.run(main())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+# Longest parameter repr kept in the slow-query log
+MAX_LOGGED_PARAMETERS = 1000
+# Bind parameters whose names contain one of these are masked in the log
+SENSITIVE_PARAMETER_NAMES = ("password", "secret", "token")
+REDACTED = "<redacted>"
+
+
+class QueryStats:
+    """
+    SQL statements issued on behalf of one request
+    """
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statement_counts: Dict[str, int] = {}
+
+    def record(self, statement: str, duration: float) -> int:
+        """
+        Record an executed statement, returning how often it ran so far
+        """
+        self.count += 1
+        self.duration += duration
+        if duration > self.slowest_duration:
+            self.slowest_duration = duration
+            self.slowest_statement = statement
+
+        # Parameters are bound, so the statement text is the statement shape
+        repeats = self.statement_counts.get(statement, 0) + 1
+        self.statement_counts[statement] = repeats
+        return repeats
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@contextmanager
+def track_queries(request_id: str) -> Iterator[QueryStats]:
+    """
+    Collect statistics of the statements executed within the block
+    """
+    stats = QueryStats(request_id)
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+def is_sensitive_parameter(name: str) -> bool:
+    name = name.lower()
+    return any(part in name for part in SENSITIVE_PARAMETER_NAMES)
+
+
+def redact_parameters(context: Any, parameters: Any, executemany: bool) -> Any:
+    """
+    Mask the values of sensitive bind parameters, e.g. users.hashed_password
+
+    Positional values are named through the compiled statement. Rows that
+    cannot be named, e.g. those of raw driver SQL, are masked altogether.
+    """
+    names = getattr(getattr(context, "compiled", None), "positiontup", None)
+
+    def redact_row(row: Any) -> Any:
+        if isinstance(row, dict):
+            return {
+                name: REDACTED if is_sensitive_parameter(name) else value
+                for name, value in row.items()
+            }
+        if not row:
+            return row
+        if names is None or len(names) != len(row):
+            return REDACTED
+        return tuple(
+            REDACTED if is_sensitive_parameter(name) else value
+            for name, value in zip(names, row)
+        )
+
+    if executemany:
+        return [redact_row(row) for row in parameters]
+    return redact_row(parameters)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Time every statement of an engine and attribute it to the current request
+
+    SQLAlchemy runs cursor events in a greenlet that shares the context of the
+    awaiting task, so the request's QueryStats is visible here.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_timer(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        context.query_start_time = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def record_query(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        duration = time.perf_counter() - context.query_start_time
+        stats = current_query_stats.get()
+        request_id = stats.request_id if stats is not None else None
+
+        if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            logged_parameters = redact_parameters(context, parameters, executemany)
+            logger.bind(request_id=request_id, duration=duration).warning(
+                "Slow query ({:.3f}s): {} Parameters: {}",
+                duration,
+                statement,
+                repr(logged_parameters)[:MAX_LOGGED_PARAMETERS],
+            )
+
+        if stats is None:
+            return
+
+        repeats = stats.record(statement, duration)
+        if settings.LOG_MODE == "dev" and repeats == settings.N_PLUS_ONE_THRESHOLD + 1:
+            logger.bind(request_id=request_id).warning(
+                "Possible N+1 query, statement ran {} times in one request: {}",
+                repeats,
+                statement,
+            )
@@ -0,0 +1,391 @@
+import asyncio
+import fcntl
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+AGGREGATE_FILE = "metrics-aggregate.json"
+LOCK_FILE = "metrics-aggregate.lock"
+
+_worker: Optional[Tuple[int, int]] = None
+
+
+def worker_identity() -> Tuple[int, int]:
+    """
+    Pid and start time of this worker, telling apart workers that reuse a pid
+    """
+    global _worker
+    if _worker is None or _worker[0] != os.getpid():
+        _worker = (os.getpid(), time.time_ns())
+    return _worker
+
+
+class Metric:
+    """
+    Base class of a labelled metric
+
+    Metrics are only updated from the event loop thread of a worker, so the
+    plain dicts below need no locking.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[LabelValues, Any] = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(labels), value] for labels, value in self.values.items()],
+        }
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def set(self, value: float, *labels: str) -> None:
+        """
+        Mirror a monotonic total kept elsewhere, for use in collectors
+        """
+        self.values[labels] = value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) - amount
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        # Per-bucket (non-cumulative) counts, then +Inf bucket, sum and count
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = super().snapshot()
+        snapshot["buckets"] = list(self.buckets)
+        return snapshot
+
+
+class MetricsRegistry:
+    """
+    In-process metrics registry rendered in the Prometheus text format
+
+    With METRICS_MULTIPROC_DIR set, every worker periodically writes its snapshot
+    to a file in that directory and /metrics merges the files of all workers.
+    Counters and histograms of exited workers are folded into one aggregate file,
+    their gauges are dropped.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Any:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """
+        Register a callback that refreshes gauges right before a snapshot
+        """
+        self.collectors.append(collector)
+
+    def snapshot(self) -> Dict[str, Any]:
+        for collector in self.collectors:
+            collector()
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def write_snapshot(self, directory: str) -> None:
+        """
+        Atomically write this worker's snapshot into the multiprocess directory
+        """
+        pid, started_at = worker_identity()
+        write_json(
+            os.path.join(directory, f"metrics-{pid}-{started_at}.json"),
+            {"pid": pid, "started_at": started_at, "metrics": self.snapshot()},
+        )
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Snapshot of this worker, merged with all workers in multiprocess mode
+        """
+        directory = settings.METRICS_MULTIPROC_DIR
+        if not directory:
+            return self.snapshot()
+
+        with directory_lock(directory):
+            self.write_snapshot(directory)
+            return merge_snapshots(fold_exited_snapshots(directory))
+
+    def render(self) -> str:
+        return render_snapshot(self.collect())
+
+
+def write_json(path: str, data: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def directory_lock(directory: str) -> Iterator[None]:
+    """
+    Serialize folding and merging of the snapshot files between workers
+    """
+    with open(os.path.join(directory, LOCK_FILE), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def running_check(snapshots: List[Dict[str, Any]]) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Build a predicate telling whether the worker of a snapshot is still running
+
+    Of several snapshots with the same pid only the latest started one can be.
+    """
+    latest: Dict[int, int] = {}
+    for snapshot in snapshots:
+        pid = snapshot["pid"]
+        if pid is not None:
+            latest[pid] = max(latest.get(pid, 0), snapshot.get("started_at", 0))
+
+    def running(snapshot: Dict[str, Any]) -> bool:
+        pid = snapshot["pid"]
+        return (
+            pid is not None
+            and snapshot.get("started_at", 0) == latest[pid]
+            and process_alive(pid)
+        )
+
+    return running
+
+
+def fold_exited_snapshots(directory: str) -> List[Dict[str, Any]]:
+    """
+    Fold the snapshots of exited workers into the aggregate file and delete them
+
+    Returns the aggregate followed by the snapshots of running workers. The
+    caller must hold directory_lock.
+    """
+    aggregate_path = os.path.join(directory, AGGREGATE_FILE)
+    aggregate: Optional[Dict[str, Any]] = None
+    snapshots: List[Tuple[str, Dict[str, Any]]] = []
+    for file_name in os.listdir(directory):
+        if not (file_name.startswith("metrics-") and file_name.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(directory, file_name)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if file_name == AGGREGATE_FILE:
+            aggregate = snapshot
+        else:
+            snapshots.append((file_name, snapshot))
+
+    running = running_check([snapshot for _, snapshot in snapshots])
+    live = [snapshot for _, snapshot in snapshots if running(snapshot)]
+    exited = [(name, snapshot) for name, snapshot in snapshots if not running(snapshot)]
+    if exited:
+        # Write the aggregate before deleting, a crash in between at worst keeps
+        # a file that is then counted twice rather than losing its counts
+        folded = [{**snapshot, "pid": None} for _, snapshot in exited]
+        if aggregate is not None:
+            folded.append(aggregate)
+        aggregate = {"pid": None, "metrics": merge_snapshots(folded)}
+        write_json(aggregate_path, aggregate)
+        for file_name, _ in exited:
+            os.remove(os.path.join(directory, file_name))
+
+    return ([aggregate] if aggregate is not None else []) + live
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sum the metrics of several worker snapshots
+    """
+    running = running_check(snapshots)
+    merged: Dict[str, Any] = {}
+    for snapshot in snapshots:
+        alive = running(snapshot)
+        for name, metric in snapshot["metrics"].items():
+            if metric["type"] == "gauge" and not alive:
+                continue
+
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = value
+                elif metric["type"] == "histogram":
+                    target["samples"][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target["samples"][key] = current + value
+
+    for metric in merged.values():
+        metric["samples"] = [[list(k), v] for k, v in metric["samples"].items()]
+    return merged
+
+
+def format_labels(names: Iterable[str], values: Iterable[str], **extra: str) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def render_snapshot(snapshot: Dict[str, Any]) -> str:
+    """
+    Render a (merged) snapshot in the Prometheus text exposition format
+    """
+    lines: List[str] = []
+    for name, metric in snapshot.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+
+        for labels, value in metric["samples"]:
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{format_labels(labelnames, labels)} {value}")
+                continue
+
+            cumulative = 0
+            bounds = [str(b) for b in metric["buckets"]] + ["+Inf"]
+            for bound, count in zip(bounds, value[:-2]):
+                cumulative += count
+                bucket_labels = format_labels(labelnames, labels, le=bound)
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labelnames, labels)} {value[-2]}")
+            lines.append(f"{name}_count{format_labels(labelnames, labels)} {value[-1]}")
+
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+)
+APP_EXCEPTIONS = registry.counter(
+    "app_exceptions_total", "Handled exceptions by error code", ("error_code",)
+)
+PASSWORD_HASH_DURATION = registry.histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hashing and verification time",
+    ("operation",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+
+
+def reset_multiproc_dir(directory: str) -> None:
+    """
+    Remove snapshots left by the workers of a previous server run
+    """
+    os.makedirs(directory, exist_ok=True)
+    for file_name in os.listdir(directory):
+        if file_name.startswith("metrics-"):
+            os.remove(os.path.join(directory, file_name))
+
+
+async def flush_periodically(interval: Optional[float] = None) -> None:
+    """
+    Background task writing this worker's snapshot in multiprocess mode
+    """
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return
+
+    os.makedirs(directory, exist_ok=True)
+    while True:
+        with directory_lock(directory):
+            registry.write_snapshot(directory)
+            fold_exited_snapshots(directory)
+        await asyncio.sleep(interval or settings.METRICS_FLUSH_SECONDS)
@@ -1,61 +1,189 @@
+import random
 import time
 import uuid
-from typing import Callable
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
+from app.core.db import READ_AFTER_WRITE_COOKIE
+from app.core.instrumentation import track_queries
+from app.core.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """
-    Middleware for logging request information using loguru
+    Pure ASGI middleware for logging request information using loguru
+
+    Avoids the extra task and memory stream BaseHTTPMiddleware adds per request,
+    and leaves streaming response bodies untouched. SQL statements of the request
+    are tracked as well and reported in a Server-Timing header and the log.
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        start_time = time.time()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Log request start
-        logger.info(
-            f"Request started: {request.method} {request.url.path} (ID: {request_id})"
+        request_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        status_code = 500
+
+        # Successful requests are logged for a sample only, errors always are
+        sampled = random.random() < settings.LOG_SAMPLE_RATE
+        log = logger.bind(
+            request_id=request_id, method=scope["method"], path=scope["path"]
         )
 
-        # Process the request
-        try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-
-            # Add custom headers
-            response.headers["X-Process-Time"] = str(process_time)
-            response.headers["X-Request-ID"] = request_id
-
-            # Log request completion
-            logger.info(
-                f"Request completed: {request.method} {request.url.path} "
-                f"(ID: {request_id}) Status: {response.status_code} "
-                f"Time: {process_time:.3f}s"
+        start_time = time.perf_counter_ns()
+
+        # Log request start
+        if sampled:
+            log.info(
+                "Request started: {} {} (ID: {})",
+                scope["method"],
+                scope["path"],
+                request_id,
             )
-            return response
 
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = (time.perf_counter_ns() - start_time) / 1e9
+
+                # Add custom headers
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = str(process_time)
+                headers["X-Request-ID"] = request_id
+                headers["Server-Timing"] = (
+                    f"db;dur={query_stats.duration * 1000:.3f};"
+                    f'desc="{query_stats.count} queries"'
+                )
+            await send(message)
+
+        # Process the request, attributing its SQL statements to it
+        try:
+            with track_queries(request_id) as query_stats:
+                scope["state"]["query_stats"] = query_stats
+                await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            process_time = time.time() - start_time
+            process_time = (time.perf_counter_ns() - start_time) / 1e9
 
             # Log request failure
-            logger.error(
-                f"Request failed: {request.method} {request.url.path} "
-                f"(ID: {request_id}) Error: {str(e)} "
-                f"Time: {process_time:.3f}s"
+            log.bind(duration=process_time).error(
+                "Request failed: {} {} (ID: {}) Error: {} Time: {:.3f}s",
+                scope["method"],
+                scope["path"],
+                request_id,
+                e,
+                process_time,
             )
-            logger.exception(e)
+            log.exception(e)
             raise
 
+        if not sampled and status_code < 400:
+            return
+
+        process_time = (time.perf_counter_ns() - start_time) / 1e9
+
+        # Log request completion
+        log.bind(
+            status=status_code,
+            duration=process_time,
+            db_queries=query_stats.count,
+            db_time=query_stats.duration,
+            slowest_query=query_stats.slowest_statement,
+        ).info(
+            "Request completed: {} {} (ID: {}) Status: {} Time: {:.3f}s",
+            scope["method"],
+            scope["path"],
+            request_id,
+            status_code,
+            process_time,
+        )
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request counts, latency and in-flight requests
+
+    Requests are labelled by route template (e.g. /api/v1/items/{item_id}) rather
+    than the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or "unmatched"
+            labels = (scope["method"], template, str(status_code))
+            HTTP_REQUESTS.inc(*labels)
+            HTTP_REQUEST_DURATION.observe(duration, *labels)
+
+
+class ReadAfterWriteMiddleware:
+    """
+    Pure ASGI middleware pinning clients that just wrote to the primary database
+
+    Successful unsafe requests get a short-lived cookie that makes get_read_db
+    serve the client's following reads from the primary, so a lagging read
+    engine never hides the client's own writes.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.READ_AFTER_WRITE_SECONDS
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{READ_AFTER_WRITE_COOKIE}={time.time() + window:.3f}; "
+                    f"Max-Age={int(window) + 1}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
 
 def setup_middlewares(app: FastAPI) -> None:
     """
@@ -70,5 +198,12 @@ def setup_middlewares(app: FastAPI) -> None:
         allow_headers=["*"],
     )
 
+    # Read-after-write stickiness, only needed with a separate read engine
+    if settings.READ_DATABASE_URL:
+        app.add_middleware(ReadAfterWriteMiddleware)
+
+    # Request metrics middleware
+    app.add_middleware(MetricsMiddleware)
+
     # Request logging middleware
     app.add_middleware(RequestLoggingMiddleware)
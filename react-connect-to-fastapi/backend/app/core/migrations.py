@@ -0,0 +1,220 @@
+import hashlib
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import AsyncIterator, Callable, List, NamedTuple, Optional, Set
+
+from loguru import logger
+from sqlalchemy import (
+    Column,
+    Connection,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    select,
+)
+from sqlalchemy.engine import Dialect
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.core.db import Base
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+# Bookkeeping table kept out of Base.metadata so create_all never touches it
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+# Fingerprint of the schema the database was last initialized for
+schema_fingerprint_table = Table(
+    "schema_fingerprint",
+    migration_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+def create_model_indexes(table_name: str, *index_names: str) -> Callable:
+    """
+    Upgrade step creating indexes declared on a model, if not present yet
+    """
+
+    def upgrade(conn: Connection) -> None:
+        table = Base.metadata.tables[table_name]
+        for index in table.indexes:
+            if index.name in index_names:
+                index.create(conn, checkfirst=True)
+
+    return upgrade
+
+
+ITEM_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        title, description, content='items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_update
+    AFTER UPDATE OF title, description ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO items_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    # Index the rows that existed before the triggers
+    "INSERT INTO items_fts(items_fts) VALUES ('rebuild')",
+]
+
+
+def create_item_search(conn: Connection) -> None:
+    """
+    Upgrade step creating the FTS5 item index and its sync triggers
+
+    Triggers cover every write path, including bulk statements and cascades.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+
+    for statement in ITEM_SEARCH_DDL:
+        conn.exec_driver_sql(statement)
+
+
+# Append only: applied versions are never run again
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "Index items by owner and by creation time",
+        create_model_indexes("items", "ix_items_owner_id_id", "ix_items_created_at_id"),
+    ),
+    Migration(2, "Full-text search index over items", create_item_search),
+]
+
+
+def applied_versions(conn: Connection) -> Set[int]:
+    migration_metadata.create_all(conn)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+@asynccontextmanager
+async def locked_transaction(engine: AsyncEngine) -> AsyncIterator[AsyncConnection]:
+    """
+    Transaction holding the database write lock from its first statement
+
+    Workers migrating the same SQLite file at once then wait for each other
+    instead of both acting on what they read before the other one committed.
+    """
+    async with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            await conn.exec_driver_sql("BEGIN IMMEDIATE")
+        yield conn
+
+
+async def run_migrations(
+    engine: AsyncEngine, migrations: List[Migration] = MIGRATIONS
+) -> List[int]:
+    """
+    Apply pending migrations in version order, each in its own transaction
+
+    Returns the versions applied by this run. A migration applied meanwhile by
+    another worker is skipped.
+    """
+    async with locked_transaction(engine) as conn:
+        done = await conn.run_sync(applied_versions)
+
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in done:
+            continue
+
+        async with locked_transaction(engine) as conn:
+            # Check again now that no other worker can write
+            if migration.version in await conn.run_sync(applied_versions):
+                continue
+
+            logger.info(
+                "Applying migration {}: {}", migration.version, migration.description
+            )
+            await conn.run_sync(migration.upgrade)
+            await conn.execute(
+                schema_migrations.insert().values(
+                    version=migration.version,
+                    description=migration.description,
+                    applied_at=datetime.now(UTC),
+                )
+            )
+        applied.append(migration.version)
+
+    if not applied:
+        logger.info("Database schema is up to date")
+    return applied
+
+
+def schema_fingerprint(dialect: Dialect) -> str:
+    """
+    Hash of the models' DDL and the known migrations
+
+    Changes whenever a table, column, index or migration is added or altered.
+    """
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(str(CreateTable(table).compile(dialect=dialect)))
+        parts.extend(
+            sorted(str(CreateIndex(i).compile(dialect=dialect)) for i in table.indexes)
+        )
+    parts.extend(f"{m.version}:{m.description}" for m in MIGRATIONS)
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+async def get_stored_fingerprint(engine: AsyncEngine) -> Optional[str]:
+    """
+    Fingerprint recorded by the last successful init, None if never initialized
+    """
+    try:
+        async with engine.connect() as conn:
+            return await conn.scalar(
+                select(schema_fingerprint_table.c.fingerprint).where(
+                    schema_fingerprint_table.c.id == 1
+                )
+            )
+    except DBAPIError:
+        # The table does not exist yet
+        return None
+
+
+async def store_fingerprint(engine: AsyncEngine, fingerprint: str) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(migration_metadata.create_all)
+        await conn.execute(schema_fingerprint_table.delete())
+        await conn.execute(
+            schema_fingerprint_table.insert().values(
+                id=1, fingerprint=fingerprint, updated_at=datetime.now(UTC)
+            )
+        )
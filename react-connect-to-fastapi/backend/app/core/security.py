@@ -1,12 +1,64 @@
+import hashlib
+import time
 from datetime import UTC, datetime, timedelta
-from typing import Any, Optional, Union
-
-from jose import jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple, TypeVar, Union
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_DURATION, registry
+from app.core.workers import BoundedWorkerPool
+from app.schemas.token import TokenPayload
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+class InvalidTokenError(ValueError):
+    """
+    Raised for access tokens that fail signature or expiry verification
+    """
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    """
+    Build the passlib context on first use
+
+    passlib and the bcrypt backend are imported lazily, like jose below, so that
+    importing this module (and starting a worker) stays cheap.
+    """
+    from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Dedicated threads for bcrypt so login bursts never block the event loop
+password_pool = BoundedWorkerPool(
+    name="password-hash",
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+PASSWORD_POOL_QUEUE_DEPTH = registry.gauge(
+    "password_pool_queue_depth", "Password hashing jobs waiting for a worker"
+)
+PASSWORD_POOL_REJECTED = registry.counter(
+    "password_pool_rejected_total", "Password hashing jobs rejected when saturated"
+)
+
+
+def collect_password_pool_metrics() -> None:
+    PASSWORD_POOL_QUEUE_DEPTH.set(password_pool.queue_depth)
+    PASSWORD_POOL_REJECTED.set(password_pool.rejected)
+
+
+registry.add_collector(collect_password_pool_metrics)
+
+# Verified token payloads keyed by token digest, each expiring at the token's exp
+token_cache: TTLCache[TokenPayload] = TTLCache(
+    max_size=settings.TOKEN_CACHE_SIZE, ttl=0.0
+)
 
 
 def create_access_token(
@@ -15,6 +67,8 @@ def create_access_token(
     """
     Create a JWT access token
     """
+    from jose import jwt
+
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
     else:
@@ -35,15 +89,74 @@ def create_access_token(
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> TokenPayload:
+    """
+    Verify a JWT access token and return its payload
+
+    Successfully verified tokens are cached until they expire, so a bearer token
+    that is sent repeatedly only has its signature checked once per worker.
+    Raises InvalidTokenError or pydantic.ValidationError for invalid tokens.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(digest)
+    if token_data is not None:
+        return token_data
+
+    from jose import JWTError, jwt
+
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+    except JWTError as e:
+        raise InvalidTokenError(str(e)) from e
+    token_data = TokenPayload(**payload)
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(digest, token_data, ttl=exp - time.time())
+
+    return token_data
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against a hash
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """
     Hash a password
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+R = TypeVar("R")
+
+
+def _timed(func: Callable[..., R], *args: Any) -> Tuple[R, float]:
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a hash on the password worker pool
+    """
+    result, duration = await password_pool.run(
+        _timed, verify_password, plain_password, hashed_password
+    )
+    PASSWORD_HASH_DURATION.observe(duration, "verify")
+    return result
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password on the password worker pool
+    """
+    result, duration = await password_pool.run(_timed, get_password_hash, password)
+    PASSWORD_HASH_DURATION.observe(duration, "hash")
+    return result
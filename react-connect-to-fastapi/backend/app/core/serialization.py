@@ -0,0 +1,86 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(model_type: Any) -> TypeAdapter:
+    """
+    Build (once) and return the TypeAdapter for a response type
+    """
+    return TypeAdapter(model_type)
+
+
+@lru_cache(maxsize=None)
+def sparse_model(
+    model_type: type[BaseModel], fields: Optional[Tuple[str, ...]]
+) -> type[BaseModel]:
+    """
+    Build (once) a variant of a response model with only the given fields
+
+    Reading it from attributes touches only those fields, so partially loaded
+    ORM rows can be serialized. None returns the full model.
+    """
+    if fields is None:
+        return model_type
+
+    definitions: Any = {
+        name: (info.annotation, info)
+        for name, info in model_type.model_fields.items()
+        if name in fields
+    }
+    return create_model(
+        f"{model_type.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+def dump_json(model_type: Any, content: Any) -> bytes:
+    """
+    Convert content (ORM rows, dicts or models) into JSON bytes for model_type
+
+    Attribute reading, validation and JSON encoding all run inside pydantic-core,
+    skipping FastAPI's re-validation and jsonable_encoder passes.
+    """
+    adapter = get_type_adapter(model_type)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with pydantic-core's JSON encoder instead of json.dumps
+    """
+
+    def render(self, content: Any) -> bytes:
+        return get_type_adapter(Any).dump_json(content)
+
+
+class ModelResponse(Response):
+    """
+    JSON response serialized in a single pass against a response model
+
+    Routes return it directly so FastAPI skips its own response_model handling,
+    while the declared response_model still documents the endpoint.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        model_type: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        super().__init__(
+            content=dump_json(model_type, content),
+            status_code=status_code,
+            headers=headers,
+            background=background,
+        )
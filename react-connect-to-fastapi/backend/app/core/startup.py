@@ -0,0 +1,41 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from loguru import logger
+
+from app import IMPORT_STARTED
+
+
+class StartupTimer:
+    """
+    Durations of the named phases of a worker's startup
+    """
+
+    def __init__(self, started: float):
+        self.started = started
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, since: float) -> None:
+        self.phases[name] = time.perf_counter() - since
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def log(self) -> None:
+        """
+        Log the total startup time and its breakdown in one record
+        """
+        total = time.perf_counter() - self.started
+        breakdown = ", ".join(f"{name} {d:.3f}s" for name, d in self.phases.items())
+        logger.bind(startup_total=total, startup_phases=self.phases).info(
+            "Startup complete in {:.3f}s ({})", total, breakdown
+        )
+
+
+startup_timer = StartupTimer(IMPORT_STARTED)
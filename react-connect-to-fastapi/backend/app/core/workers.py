@@ -0,0 +1,108 @@
+import asyncio
+import time
+from contextlib import suppress
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.core.errors import ServiceUnavailableError
+
+R = TypeVar("R")
+
+
+class BoundedWorkerPool:
+    """
+    Size-limited thread pool for CPU-heavy work that must not block the event loop
+
+    At most max_workers jobs run at once and at most max_queue more may wait for
+    a worker; anything beyond that is rejected with a 503 instead of piling up.
+    Counters are only touched from the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.name
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., R], *args: Any) -> R:
+        """
+        Run func(*args) on the pool and wait for its result
+        """
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ServiceUnavailableError(f"The {self.name} pool is saturated")
+
+        submitted_at = time.perf_counter()
+
+        def job() -> Tuple[float, R]:
+            return time.perf_counter() - submitted_at, func(*args)
+
+        # The job keeps its slot until the worker thread finishes it, even when the
+        # awaiting request is cancelled first
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(job)
+        self.pending += 1
+        future.add_done_callback(lambda _: self._release(loop))
+        queue_wait, result = await asyncio.wrap_future(future)
+
+        self.completed += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+
+        return result
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Free the slot of a finished job, called from the worker thread
+        """
+        with suppress(RuntimeError):
+            loop.call_soon_threadsafe(self._decrement_pending)
+
+    def _decrement_pending(self) -> None:
+        self.pending -= 1
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of jobs currently waiting for a free worker
+        """
+        return max(0, self.pending - self.max_workers)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Occupancy, rejection and queue-wait metrics
+        """
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_avg": (
+                self.queue_wait_total / self.completed if self.completed else 0.0
+            ),
+            "queue_wait_max": self.queue_wait_max,
+        }
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker threads without waiting, they are recreated on next use
+
+        Queued jobs are cancelled; a job already running finishes in the background.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -2,15 +2,14 @@ from typing import Annotated, Generator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.db import get_db
 from app.core.errors import AuthenticationError, PermissionDeniedError
+from app.core.security import InvalidTokenError, decode_access_token
 from app.models.user import User
-from app.schemas.token import TokenPayload
 from app.services.user import UserService
 
 # OAuth2 scheme for token authentication
@@ -25,11 +24,8 @@ async def get_current_user(
     Dependency to get current authenticated user
     """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
+        token_data = decode_access_token(token)
+    except (InvalidTokenError, ValidationError):
         raise AuthenticationError("Could not validate credentials")
 
     # Check if user_id exists in payload
@@ -38,7 +34,7 @@ async def get_current_user(
 
     # Get user from database
     user_service = UserService(db)
-    user = await user_service.get_by_id(token_data.user_id)
+    user = await user_service.get_by_id_cached(token_data.user_id)
 
     if not user:
         raise AuthenticationError("User not found")
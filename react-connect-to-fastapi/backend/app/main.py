@@ -1,13 +1,20 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from loguru import logger
 
 from app.api import api_router
-from app.core.config import settings
+from app.api.routes.metrics import router as metrics_router
+from app.core.config import settings, setup_logging
+from app.core.db import dispose_engines
 from app.core.errors import setup_exception_handlers
 from app.core.init_db import init_db
+from app.core.metrics import flush_periodically
 from app.core.middleware import setup_middlewares
+from app.core.security import password_pool
+from app.core.startup import startup_timer
 
 
 @asynccontextmanager
@@ -16,19 +23,38 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for the FastAPI application
     Handles startup and shutdown events
     """
-    # Startup: Initialize database
-    await init_db()
+    # Startup: Initialize database, unless it is already at this schema version
+    if settings.INIT_DB_ON_STARTUP:
+        with startup_timer.phase("init_db"):
+            await init_db()
+
+    # Share metrics with the other workers when running multiprocess
+    metrics_flusher = None
+    if settings.METRICS_MULTIPROC_DIR:
+        metrics_flusher = asyncio.create_task(flush_periodically())
+
+    startup_timer.log()
 
     yield
 
-    # Shutdown: Clean up resources if needed
-    # (no cleanup needed for this app)
+    if metrics_flusher is not None:
+        metrics_flusher.cancel()
+        with suppress(asyncio.CancelledError):
+            await metrics_flusher
+
+    # Shutdown: Stop the password hashing threads, close pooled connections and
+    # drain enqueued log records
+    password_pool.shutdown()
+    await dispose_engines()
+    await logger.complete()
 
 
 def create_application() -> FastAPI:
     """
     Create and configure the FastAPI application
     """
+    setup_logging()
+
     # Create FastAPI app
     app = FastAPI(
         title=settings.PROJECT_NAME,
@@ -47,10 +73,16 @@ def create_application() -> FastAPI:
     # Include API router
     app.include_router(api_router, prefix=settings.API_V1_STR)
 
+    # Prometheus scrapes the conventional path at the root
+    app.include_router(metrics_router)
+
     return app
 
 
-app = create_application()
+startup_timer.record("imports", startup_timer.started)
+
+with startup_timer.phase("create_application"):
+    app = create_application()
 
 
 @app.get("/")
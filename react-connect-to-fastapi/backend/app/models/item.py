@@ -1,8 +1,9 @@
 from datetime import UTC, datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import column, table
 
 from app.core.db import Base
 
@@ -13,6 +14,12 @@ class Item(Base):
     """
 
     __tablename__ = "items"
+    __table_args__ = (
+        # Owner listings and the owner cascade, both keyset-ordered by id
+        Index("ix_items_owner_id_id", "owner_id", "id"),
+        # Chronological listings with id as tie-breaker
+        Index("ix_items_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), index=True)
@@ -27,3 +34,14 @@ class Item(Base):
 
     # Define relationship to User
     owner = relationship("User", back_populates="items")
+
+
+# FTS5 index over item titles and descriptions (SQLite only), created and kept in
+# sync with items by triggers from migration 2; the column named like the table
+# is the one MATCH is applied to
+item_search = table(
+    "items_fts",
+    column("rowid", Integer),
+    column("rank", Float),
+    column("items_fts"),
+)
@@ -1,10 +1,29 @@
-from app.schemas.common import HealthResponse, PaginatedResponse, PaginationParams
+from app.schemas.common import (
+    CacheStats,
+    CursorPaginatedResponse,
+    DbPoolStats,
+    HealthResponse,
+    PaginatedResponse,
+    PaginationParams,
+    WorkerPoolStats,
+)
 from app.schemas.item import (
+    BulkDeleteRequest,
+    BulkDeleteResponse,
+    BulkItemCreateRequest,
+    BulkItemResponse,
+    BulkItemResult,
+    BulkItemUpdateEntry,
+    BulkItemUpdateRequest,
     ItemBase,
     ItemCreate,
     ItemDetailResponse,
+    ItemDetailWithOwnerResponse,
+    ItemImportError,
+    ItemImportResponse,
     ItemResponse,
     ItemUpdate,
+    ItemWithOwnerResponse,
 )
 from app.schemas.token import Token, TokenPayload
 from app.schemas.user import (
@@ -12,6 +31,7 @@ from app.schemas.user import (
     UserBase,
     UserCreate,
     UserResponse,
+    UserSummary,
     UserUpdate,
 )
 
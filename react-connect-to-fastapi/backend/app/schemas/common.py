@@ -1,4 +1,4 @@
-from typing import Generic, List, Optional, TypeVar
+from typing import Generic, List, Literal, Optional, TypeVar
 
 from pydantic import BaseModel, Field
 
@@ -12,6 +12,16 @@ class PaginationParams(BaseModel):
 
     page: int = Field(1, ge=1, description="Page number")
     limit: int = Field(10, ge=1, le=100, description="Items per page")
+    mode: Literal["offset", "cursor"] = Field(
+        "offset", description="Pagination mode, cursor skips the total count"
+    )
+    cursor: Optional[str] = Field(
+        None, description="Opaque cursor from a previous page (implies cursor mode)"
+    )
+
+    @property
+    def use_cursor(self) -> bool:
+        return self.mode == "cursor" or self.cursor is not None
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
@@ -26,9 +36,61 @@ class PaginatedResponse(BaseModel, Generic[T]):
     pages: int
 
 
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    """
+    Generic response model for keyset (cursor) paginated results
+    """
+
+    items: List[T]
+    limit: int
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+
 class HealthResponse(BaseModel):
     """
     Health check response
     """
 
     status: str
+
+
+class CacheStats(BaseModel):
+    """
+    Hit/miss counters of an in-process cache
+    """
+
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+
+class WorkerPoolStats(BaseModel):
+    """
+    Occupancy and queue-wait metrics of a bounded worker pool
+    """
+
+    max_workers: int
+    max_queue: int
+    pending: int
+    queue_depth: int
+    completed: int
+    rejected: int
+    queue_wait_avg: float
+    queue_wait_max: float
+
+
+class DbPoolStats(BaseModel):
+    """
+    Live statistics of a database connection pool
+    """
+
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_avg: float
+    wait_max: float
@@ -3,6 +3,9 @@ from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from app.core.config import settings
+from app.schemas.user import UserSummary
+
 
 # Shared properties
 class ItemBase(BaseModel):
@@ -30,7 +33,7 @@ class ItemResponse(ItemBase):
     model_config = ConfigDict(from_attributes=True)
 
 
-# Properties to return with expanded owner information
+# Properties to return for a single item
 class ItemDetailResponse(ItemResponse):
     description: Optional[str] = None
     updated_at: datetime
@@ -38,6 +41,20 @@ class ItemDetailResponse(ItemResponse):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Listed item with expanded owner information (expand=owner)
+class ItemWithOwnerResponse(ItemResponse):
+    owner: UserSummary
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Single item with expanded owner information (expand=owner)
+class ItemDetailWithOwnerResponse(ItemDetailResponse):
+    owner: UserSummary
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # Request for bulk delete operation
 class BulkDeleteRequest(BaseModel):
     ids: List[int] = Field(..., description="List of item IDs to delete")
@@ -51,3 +68,55 @@ class BulkDeleteResponse(BaseModel):
     failed_ids: List[int] = Field(
         default_factory=list, description="IDs that failed to delete"
     )
+
+
+# Request for bulk create operation
+class BulkItemCreateRequest(BaseModel):
+    items: List[ItemCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BULK_WRITE_MAX_ITEMS,
+        description="Items to create",
+    )
+
+
+# Single entry of a bulk update operation
+class BulkItemUpdateEntry(ItemUpdate):
+    id: int = Field(..., ge=1, description="ID of the item to update")
+
+
+# Request for bulk update operation
+class BulkItemUpdateRequest(BaseModel):
+    items: List[BulkItemUpdateEntry] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BULK_WRITE_MAX_ITEMS,
+        description="Item updates, each with the ID of the item to update",
+    )
+
+
+# Outcome of a single bulk create/update entry, in request order
+class BulkItemResult(BaseModel):
+    id: Optional[int] = Field(None, description="ID of the created/updated item")
+    success: bool
+    error: Optional[str] = None
+
+
+# Response for bulk create/update operations
+class BulkItemResponse(BaseModel):
+    results: List[BulkItemResult] = Field(default_factory=list)
+
+
+# A rejected line of an item import
+class ItemImportError(BaseModel):
+    line: int = Field(..., description="1-based line number in the upload")
+    error: str
+
+
+# Summary of an item import
+class ItemImportResponse(BaseModel):
+    accepted: int = 0
+    rejected: int = 0
+    errors: List[ItemImportError] = Field(
+        default_factory=list, description="The first rejected lines, in order"
+    )
@@ -79,6 +79,15 @@ class UserResponse(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Compact public representation of a user, e.g. an item's owner
+class UserSummary(BaseModel):
+    id: int
+    username: str
+    full_name: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # Additional properties for admin-only responses
 class UserAdminResponse(UserResponse):
     is_superuser: bool
@@ -1,13 +1,123 @@
-from typing import Dict, List, Optional, Tuple
-
-from sqlalchemy import func, select
+from datetime import UTC, datetime
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from pydantic import ValidationError
+from sqlalchemy import Row, and_, delete, func, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.core.errors import NotFoundError, PermissionDeniedError
-from app.models.item import Item
+from sqlalchemy.orm import selectinload
+
+from app.core.cache import (
+    CachedResponse,
+    InMemoryResponseCache,
+    ResponseCache,
+    shared_generations,
+)
+from app.core.config import settings
+from app.core.errors import (
+    BadRequestError,
+    NotFoundError,
+    PermissionDeniedError,
+    PreconditionFailedError,
+)
+from app.models.item import Item, item_search
 from app.models.user import User
 from app.schemas.common import PaginationParams
-from app.schemas.item import ItemCreate, ItemUpdate
+from app.schemas.item import (
+    BulkItemResult,
+    BulkItemUpdateEntry,
+    ItemCreate,
+    ItemImportError,
+    ItemImportResponse,
+    ItemUpdate,
+)
+from app.schemas.user import UserSummary
+from app.utils.etag import etag_matches, resource_etag
+from app.utils.fields import Fields, load_fields
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# Serialized listing pages, namespaced per owner plus one for unfiltered listings
+item_listing_cache: ResponseCache = InMemoryResponseCache(
+    max_bytes=settings.ITEM_LISTING_CACHE_MAX_BYTES,
+    ttl=settings.ITEM_LISTING_CACHE_TTL_SECONDS,
+    generations=shared_generations("item_listings"),
+)
+
+ALL_OWNERS = "all"
+
+
+def set_item_listing_cache(backend: ResponseCache) -> None:
+    """
+    Swap the listing cache backend, e.g. for a store shared between workers
+    """
+    global item_listing_cache
+    item_listing_cache = backend
+
+
+def listing_namespace(owner_id: Optional[int]) -> Hashable:
+    """
+    Cache namespace of a listing, per owner or for the unfiltered listing
+    """
+    return ALL_OWNERS if owner_id is None else owner_id
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query matching all of its words
+
+    Every word is quoted as a phrase, so FTS5 operators and syntax characters in
+    user input are matched literally instead of raising syntax errors.
+    """
+    words = text.split()
+    if not words:
+        raise BadRequestError("Search query must contain a word")
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def describe_validation_error(error: ValidationError) -> str:
+    """
+    One-line description of the first problem of a validation error
+    """
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+def item_load_options(fields: Fields, expand_owner: bool = False) -> List[Any]:
+    """
+    Loader options for the requested item fields and expansions
+
+    Owners are loaded for a whole page with one IN query, and only with the
+    columns of their summary plus updated_at for ETags.
+    """
+    if not expand_owner:
+        return load_fields(Item, fields)
+
+    owner_columns = [getattr(User, name) for name in UserSummary.model_fields]
+    owner_columns.append(User.updated_at)
+    return [
+        *load_fields(Item, fields and (*fields, "owner_id")),
+        selectinload(Item.owner).load_only(*owner_columns),
+    ]
+
+
+def invalidate_item_listings(*owner_ids: int) -> None:
+    """
+    Drop cached listings affected by writes to items of the given owners
+    """
+    item_listing_cache.invalidate(ALL_OWNERS)
+    for owner_id in set(owner_ids):
+        item_listing_cache.invalidate(owner_id)
 
 
 class ItemService:
@@ -18,15 +128,34 @@ class ItemService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_by_id(self, item_id: int) -> Optional[Item]:
+    async def get_by_id(
+        self, item_id: int, fields: Fields = None, expand_owner: bool = False
+    ) -> Optional[Item]:
         """
-        Get item by ID
+        Get item by ID, loading only the given fields and expansions if any
         """
-        result = await self.db.execute(select(Item).where(Item.id == item_id))
+        result = await self.db.execute(
+            select(Item)
+            .where(Item.id == item_id)
+            .options(*item_load_options(fields, expand_owner))
+        )
         return result.scalar_one_or_none()
 
+    async def get_version(self, item_id: int) -> Optional[Tuple[int, datetime]]:
+        """
+        Get only the (id, updated_at) version of an item, for conditional requests
+        """
+        result = await self.db.execute(
+            select(Item.id, Item.updated_at).where(Item.id == item_id)
+        )
+        return result.tuples().one_or_none()
+
     async def get_items(
-        self, pagination: PaginationParams, owner_id: Optional[int] = None
+        self,
+        pagination: PaginationParams,
+        owner_id: Optional[int] = None,
+        fields: Fields = None,
+        expand_owner: bool = False,
     ) -> Tuple[List[Item], int]:
         """
         Get paginated list of items, optionally filtered by owner
@@ -44,7 +173,8 @@ class ItemService:
 
         # Apply pagination
         skip = (pagination.page - 1) * pagination.limit
-        query = query.offset(skip).limit(pagination.limit)
+        query = query.order_by(Item.id).offset(skip).limit(pagination.limit)
+        query = query.options(*item_load_options(fields, expand_owner))
 
         # Execute query
         result = await self.db.execute(query)
@@ -52,6 +182,158 @@ class ItemService:
 
         return items, total
 
+    def get_cached_listing(
+        self,
+        pagination: PaginationParams,
+        owner_id: Optional[int] = None,
+        fields: Fields = None,
+        expand_owner: bool = False,
+    ) -> Tuple[Optional[CachedResponse], int]:
+        """
+        Get a cached listing page and the cache version to store a fresh one with
+        """
+        namespace = listing_namespace(owner_id)
+        cache_key = (pagination.page, pagination.limit, fields, expand_owner)
+
+        return (
+            item_listing_cache.get(namespace, cache_key),
+            item_listing_cache.version(namespace),
+        )
+
+    def cache_listing(
+        self,
+        pagination: PaginationParams,
+        owner_id: Optional[int],
+        response: CachedResponse,
+        version: int,
+        fields: Fields = None,
+        expand_owner: bool = False,
+    ) -> None:
+        """
+        Store a serialized listing page, unless it was invalidated since version
+        """
+        item_listing_cache.set(
+            listing_namespace(owner_id),
+            (pagination.page, pagination.limit, fields, expand_owner),
+            response,
+            version,
+        )
+
+    async def get_items_by_cursor(
+        self,
+        pagination: PaginationParams,
+        owner_id: Optional[int] = None,
+        fields: Fields = None,
+        expand_owner: bool = False,
+    ) -> Tuple[List[Item], Optional[str]]:
+        """
+        Get a keyset-paginated list of items, optionally filtered by owner
+
+        Seeks past the last seen id instead of using OFFSET and skips the total
+        count, so every page costs the same regardless of its depth.
+        """
+        query = select(Item)
+
+        if owner_id is not None:
+            query = query.where(Item.owner_id == owner_id)
+
+        # Seek directly past the last item of the previous page
+        if pagination.cursor:
+            last_id = decode_cursor(pagination.cursor).get("id")
+            if not isinstance(last_id, int):
+                raise BadRequestError("Invalid pagination cursor")
+            query = query.where(Item.id > last_id)
+
+        # Fetch one extra row to know whether another page exists
+        query = query.order_by(Item.id).limit(pagination.limit + 1)
+        query = query.options(*item_load_options(fields, expand_owner))
+
+        result = await self.db.execute(query)
+        items = list(result.scalars().all())
+
+        next_cursor = None
+        if len(items) > pagination.limit:
+            items = items[: pagination.limit]
+            next_cursor = encode_cursor({"id": items[-1].id})
+
+        return items, next_cursor
+
+    async def stream_rows(
+        self,
+        columns: Sequence[str],
+        batch_size: int,
+        owner_id: Optional[int] = None,
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        """
+        Stream item rows in id order as batches of at most batch_size rows
+
+        Uses a server-side result with plain rows instead of ORM objects, so
+        nothing accumulates in the session and memory stays flat.
+        """
+        query = select(*(getattr(Item, name) for name in columns))
+
+        if owner_id is not None:
+            query = query.where(Item.owner_id == owner_id)
+
+        result = await self.db.stream(
+            query.order_by(Item.id).execution_options(yield_per=batch_size)
+        )
+        try:
+            async for batch in result.partitions():
+                yield batch
+        finally:
+            await result.close()
+
+    async def search(
+        self,
+        text: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        owner_id: Optional[int] = None,
+    ) -> Tuple[List[Item], Optional[str]]:
+        """
+        Full-text search over item titles and descriptions, best matches first
+
+        Ranked by bm25 and keyset-paginated on (rank, id), so deep pages seek
+        past the previous page instead of re-ranking and skipping rows.
+        """
+        if self.db.bind.dialect.name != "sqlite":
+            raise BadRequestError("Search is not supported by this database")
+
+        rank = item_search.c.rank
+        query = (
+            select(Item, rank)
+            .join(item_search, item_search.c.rowid == Item.id)
+            .where(item_search.c.items_fts.match(fts_query(text)))
+        )
+
+        if owner_id is not None:
+            query = query.where(Item.owner_id == owner_id)
+
+        # Seek past the (rank, id) of the last item of the previous page
+        if cursor:
+            values = decode_cursor(cursor)
+            last_rank, last_id = values.get("rank"), values.get("id")
+            if not isinstance(last_rank, (int, float)) or not isinstance(last_id, int):
+                raise BadRequestError("Invalid pagination cursor")
+            query = query.where(
+                or_(rank > last_rank, and_(rank == last_rank, Item.id > last_id))
+            )
+
+        # Fetch one extra row to know whether another page exists
+        query = query.order_by(rank, Item.id).limit(limit + 1)
+
+        result = await self.db.execute(query)
+        rows = result.tuples().all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_item, last_rank = rows[-1]
+            next_cursor = encode_cursor({"rank": last_rank, "id": last_item.id})
+
+        return [item for item, _ in rows], next_cursor
+
     async def create(self, item_data: ItemCreate, owner_id: int) -> Item:
         """
         Create a new item
@@ -62,15 +344,154 @@ class ItemService:
 
         self.db.add(db_item)
         await self.db.commit()
+        invalidate_item_listings(owner_id)
         await self.db.refresh(db_item)
 
         return db_item
 
+    async def bulk_create(
+        self, items_data: List[ItemCreate], owner_id: int
+    ) -> List[BulkItemResult]:
+        """
+        Create many items in one transaction
+
+        Rows are written with a single executemany INSERT ... RETURNING, so the
+        cost is one commit for the whole batch instead of one per item.
+        """
+        now = datetime.now(UTC)
+        rows = [
+            {
+                "title": item_data.title,
+                "description": item_data.description,
+                "owner_id": owner_id,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for item_data in items_data
+        ]
+
+        result = await self.db.execute(
+            insert(Item).returning(Item.id, sort_by_parameter_order=True), rows
+        )
+        created_ids = result.scalars().all()
+        await self.db.commit()
+        invalidate_item_listings(owner_id)
+
+        return [BulkItemResult(id=item_id, success=True) for item_id in created_ids]
+
+    async def import_items(
+        self, lines: AsyncIterable[Tuple[int, Optional[bytes]]], owner_id: int
+    ) -> ItemImportResponse:
+        """
+        Create items from numbered NDJSON lines as they arrive
+
+        Valid lines are inserted in transactions of IMPORT_BATCH_SIZE rows, so
+        memory is bounded by the batch size. Batches committed before a database
+        error stay committed.
+        """
+        summary = ItemImportResponse()
+        batch: List[ItemCreate] = []
+
+        def reject(line_number: int, error: str) -> None:
+            summary.rejected += 1
+            if len(summary.errors) < settings.IMPORT_MAX_ERRORS:
+                summary.errors.append(ItemImportError(line=line_number, error=error))
+
+        async for line_number, line in lines:
+            if line is None:
+                reject(line_number, "Line too long")
+                continue
+
+            try:
+                batch.append(ItemCreate.model_validate_json(line))
+            except ValidationError as e:
+                reject(line_number, describe_validation_error(e))
+                continue
+
+            if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                summary.accepted += len(await self.bulk_create(batch, owner_id))
+                batch = []
+
+        if batch:
+            summary.accepted += len(await self.bulk_create(batch, owner_id))
+
+        return summary
+
+    async def bulk_update(
+        self, entries: List[BulkItemUpdateEntry], current_user: User
+    ) -> List[BulkItemResult]:
+        """
+        Update many items in one transaction
+
+        Ownership is checked with one SELECT per chunk of ids and the permitted
+        updates are written with a single executemany UPDATE by primary key.
+        Entries for missing or foreign items, or clearing the required title,
+        are reported as failed.
+        """
+        ids = list(dict.fromkeys(entry.id for entry in entries))
+        owners: Dict[int, int] = {}
+
+        chunk_size = settings.BULK_CHUNK_SIZE
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start : start + chunk_size]
+            result = await self.db.execute(
+                select(Item.id, Item.owner_id).where(Item.id.in_(chunk))
+            )
+            owners.update(result.tuples().all())
+
+        now = datetime.now(UTC)
+        results: List[BulkItemResult] = []
+        rows = []
+        updated_owners: Set[int] = set()
+
+        for entry in entries:
+            owner_id = owners.get(entry.id)
+            if owner_id is None:
+                results.append(
+                    BulkItemResult(id=entry.id, success=False, error="not_found")
+                )
+                continue
+
+            # Check if user is owner or superuser
+            if owner_id != current_user.id and not current_user.is_superuser:
+                results.append(
+                    BulkItemResult(
+                        id=entry.id, success=False, error="permission_denied"
+                    )
+                )
+                continue
+
+            update_data = entry.model_dump(exclude_unset=True)
+            # An explicit null would violate NOT NULL and abort the whole batch
+            if "title" in update_data and update_data["title"] is None:
+                results.append(
+                    BulkItemResult(id=entry.id, success=False, error="title_required")
+                )
+                continue
+
+            rows.append({**update_data, "id": entry.id, "updated_at": now})
+            updated_owners.add(owner_id)
+            results.append(BulkItemResult(id=entry.id, success=True))
+
+        if rows:
+            await self.db.execute(update(Item), rows)
+            await self.db.commit()
+            invalidate_item_listings(*updated_owners)
+
+        return results
+
     async def update(
-        self, item_id: int, item_data: ItemUpdate, current_user: User
+        self,
+        item_id: int,
+        item_data: ItemUpdate,
+        current_user: User,
+        if_match: Optional[str] = None,
     ) -> Item:
         """
         Update an item
+
+        When if_match is given the update is rejected unless it matches the
+        item's current ETag.
         """
         # Get item
         item = await self.get_by_id(item_id)
@@ -83,6 +504,12 @@ class ItemService:
                 "You do not have permission to update this item"
             )
 
+        # Reject conflicting writes before touching the row
+        if if_match is not None and not etag_matches(
+            if_match, resource_etag(item), weak=False
+        ):
+            raise PreconditionFailedError("Item has been modified")
+
         # Update item fields
         update_data = item_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
@@ -91,6 +518,7 @@ class ItemService:
         # Commit changes
         await self.db.commit()
         await self.db.refresh(item)
+        invalidate_item_listings(item.owner_id)
 
         return item
 
@@ -112,6 +540,7 @@ class ItemService:
         # Delete item
         await self.db.delete(item)
         await self.db.commit()
+        invalidate_item_listings(item.owner_id)
 
     async def bulk_delete(
         self, item_ids: List[int], current_user: User
@@ -119,6 +548,9 @@ class ItemService:
         """
         Delete multiple items at once
 
+        Runs one ownership-filtered DELETE ... RETURNING per chunk of ids instead
+        of loading and deleting every item individually.
+
         Args:
             item_ids: List of item IDs to delete
             current_user: Current user performing the operation
@@ -126,34 +558,31 @@ class ItemService:
         Returns:
             Dictionary with successfully deleted IDs and failed IDs
         """
-        deleted_ids = []
-        failed_ids = []
-
-        for item_id in item_ids:
-            try:
-                # Get item
-                item = await self.get_by_id(item_id)
-
-                # Skip if item not found
-                if not item:
-                    failed_ids.append(item_id)
-                    continue
+        # Deduplicate while keeping the caller's order
+        unique_ids = list(dict.fromkeys(item_ids))
+        deleted: Set[int] = set()
+        owners: Set[int] = set()
 
-                # Check if user is owner or superuser
-                if item.owner_id != current_user.id and not current_user.is_superuser:
-                    failed_ids.append(item_id)
-                    continue
+        chunk_size = settings.BULK_CHUNK_SIZE
+        for start in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[start : start + chunk_size]
 
-                # Delete item
-                await self.db.delete(item)
-                deleted_ids.append(item_id)
+            stmt = delete(Item).where(Item.id.in_(chunk))
+            # Superusers may delete any item, everyone else only their own
+            if not current_user.is_superuser:
+                stmt = stmt.where(Item.owner_id == current_user.id)
 
-            except Exception:
-                # Add to failed if any exception occurs
-                failed_ids.append(item_id)
+            result = await self.db.execute(stmt.returning(Item.id, Item.owner_id))
+            for item_id, owner_id in result.tuples():
+                deleted.add(item_id)
+                owners.add(owner_id)
 
         # Commit all successful deletions at once
-        if deleted_ids:
+        if deleted:
             await self.db.commit()
+            invalidate_item_listings(*owners)
 
-        return {"deleted_ids": deleted_ids, "failed_ids": failed_ids}
+        return {
+            "deleted_ids": [item_id for item_id in unique_ids if item_id in deleted],
+            "failed_ids": [item_id for item_id in unique_ids if item_id not in deleted],
+        }
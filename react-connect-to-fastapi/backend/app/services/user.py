@@ -4,10 +4,22 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.errors import ConflictError, NotFoundError
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import TTLCache, shared_generations
+from app.core.config import settings
+from app.core.errors import ConflictError, NotFoundError, PreconditionFailedError
+from app.core.security import get_password_hash_async, verify_password_async
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserSummary, UserUpdate
+from app.services.item import invalidate_item_listings
+from app.utils.etag import etag_matches, resource_etag
+from app.utils.fields import Fields, load_fields
+
+# Detached users keyed by id, used to resolve the authenticated user per request
+user_cache: TTLCache[User] = TTLCache(
+    max_size=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    generations=shared_generations("users"),
+)
 
 
 class UserService:
@@ -18,13 +30,33 @@ class UserService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_by_id(self, user_id: int) -> Optional[User]:
+    async def get_by_id(self, user_id: int, fields: Fields = None) -> Optional[User]:
         """
-        Get user by ID
+        Get user by ID, loading only the given fields if any
         """
-        result = await self.db.execute(select(User).where(User.id == user_id))
+        result = await self.db.execute(
+            select(User).where(User.id == user_id).options(*load_fields(User, fields))
+        )
         return result.scalar_one_or_none()
 
+    async def get_by_id_cached(self, user_id: int) -> Optional[User]:
+        """
+        Get user by ID, served from the in-process user cache when possible
+
+        The cache holds detached instances; each caller gets its own copy merged
+        into the current session without a database round trip.
+        """
+        user = user_cache.get(user_id)
+        if user is None:
+            generation = user_cache.generation(user_id)
+            user = await self.get_by_id(user_id)
+            if user is None:
+                return None
+            self.db.expunge(user)
+            user_cache.set(user_id, user, generation=generation)
+
+        return await self.db.merge(user, load=False)
+
     async def get_by_email(self, email: str) -> Optional[User]:
         """
         Get user by email
@@ -59,7 +91,7 @@ class UserService:
         db_user = User(
             email=user_data.email,
             username=user_data.username,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=await get_password_hash_async(user_data.password),
             full_name=user_data.full_name,
             is_active=user_data.is_active,
             is_superuser=False,
@@ -72,20 +104,38 @@ class UserService:
 
         return db_user
 
-    async def update(self, user_id: int, user_data: UserUpdate) -> User:
+    async def update(
+        self, user_id: int, user_data: UserUpdate, if_match: Optional[str] = None
+    ) -> User:
         """
         Update a user
+
+        When if_match is given the update is rejected unless it matches the
+        user's current ETag.
         """
-        user = await self.get_by_id(user_id)
+        # Auth may have merged a cached, possibly stale copy of this user into
+        # the session; overwrite it with the stored row before comparing
+        result = await self.db.execute(
+            select(User)
+            .where(User.id == user_id)
+            .execution_options(populate_existing=True)
+        )
+        user = result.scalar_one_or_none()
         if not user:
             raise NotFoundError("User", user_id)
 
+        # Reject conflicting writes before hashing any new password
+        if if_match is not None and not etag_matches(
+            if_match, resource_etag(user), weak=False
+        ):
+            raise PreconditionFailedError("User has been modified")
+
         # Update user fields if provided
         update_data = user_data.model_dump(exclude_unset=True)
 
         # Handle password update separately
         if "password" in update_data:
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await get_password_hash_async(update_data["password"])
             update_data["hashed_password"] = hashed_password
             del update_data["password"]
 
@@ -97,6 +147,12 @@ class UserService:
         await self.db.commit()
         await self.db.refresh(user)
 
+        # Make sure privilege and activation changes apply on the next request
+        user_cache.invalidate(user_id)
+        # Item listings expanded with owners embed the user's summary
+        if update_data.keys() & UserSummary.model_fields.keys():
+            invalidate_item_listings(user_id)
+
         return user
 
     async def delete(self, user_id: int) -> None:
@@ -110,6 +166,10 @@ class UserService:
         await self.db.delete(user)
         await self.db.commit()
 
+        user_cache.invalidate(user_id)
+        # The user's items were deleted along with it
+        invalidate_item_listings(user_id)
+
     async def authenticate(self, username: str, password: str) -> Optional[User]:
         """
         Authenticate a user
@@ -119,7 +179,10 @@ class UserService:
         if not user:
             return None
 
-        if not verify_password(password, user.hashed_password):
+        # End the read transaction so the connection is released during bcrypt
+        await self.db.commit()
+
+        if not await verify_password_async(password, user.hashed_password):
             return None
 
         return user
@@ -0,0 +1,72 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Iterable, Optional, Tuple
+
+from starlette.responses import Response
+
+
+def compute_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the given version parts
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def version_etag(resource_id: int, updated_at: datetime) -> str:
+    """
+    ETag of a single row, derived from its id and last modification time
+    """
+    # Rows read back from SQLite are naive while freshly written ones may be aware
+    return compute_etag(resource_id, updated_at.replace(tzinfo=None).isoformat())
+
+
+def resource_etag(resource: Any) -> str:
+    """
+    ETag of an ORM object carrying id and updated_at
+    """
+    return version_etag(resource.id, resource.updated_at)
+
+
+def owned_resource_etag(resource: Any) -> str:
+    """
+    ETag of an ORM object embedding its owner, which changes with either of them
+    """
+    return compute_etag(resource_etag(resource), resource_etag(resource.owner))
+
+
+def list_etag(resources: Iterable[Any], *extra: Any, with_owner: bool = False) -> str:
+    """
+    Fingerprint of a page of rows plus page-level values (e.g. total, cursor)
+
+    With with_owner, the version of each row's embedded owner is included too.
+    """
+    row_etag = owned_resource_etag if with_owner else resource_etag
+    versions: Tuple[str, ...] = tuple(row_etag(r) for r in resources)
+    return compute_etag(*versions, *extra)
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """
+    Check an If-None-Match (weak comparison) or If-Match (strong) header value
+    """
+    if not header:
+        return False
+
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if weak and candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    """
+    Empty 304 response for a matched If-None-Match
+    """
+    return Response(status_code=304, headers={"ETag": etag})
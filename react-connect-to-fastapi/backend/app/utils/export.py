@@ -0,0 +1,32 @@
+import csv
+import io
+from typing import Any, Iterable, Mapping, Sequence
+
+from app.core.serialization import get_type_adapter
+from app.schemas.item import ItemDetailResponse
+
+# Column order of exported items
+EXPORT_FIELDS = ("id", "title", "description", "owner_id", "created_at", "updated_at")
+
+
+def encode_ndjson(rows: Iterable[Mapping[str, Any]]) -> bytes:
+    """
+    Encode item rows as newline-delimited JSON, one object per line
+    """
+    adapter = get_type_adapter(ItemDetailResponse)
+    return b"".join(
+        adapter.dump_json(adapter.validate_python(row)) + b"\n" for row in rows
+    )
+
+
+def encode_csv(rows: Iterable[Sequence[Any]]) -> bytes:
+    """
+    Encode rows of values (or a header row) as CSV lines
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            value.isoformat() if hasattr(value, "isoformat") else value for value in row
+        )
+    return buffer.getvalue().encode()
@@ -0,0 +1,62 @@
+from typing import Any, Callable, List, Optional, Tuple
+
+from fastapi import Query
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only
+
+from app.core.errors import BadRequestError
+
+Fields = Optional[Tuple[str, ...]]
+
+# Columns always loaded, since ETags are computed from them
+VERSION_COLUMNS = ("id", "updated_at")
+
+
+def parse_fields(fields: Optional[str], model_type: type[BaseModel]) -> Fields:
+    """
+    Parse a comma-separated fields parameter against a response model
+
+    Returns the requested fields in model order, or None for all fields.
+    """
+    if fields is None:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        return None
+
+    unknown = requested - set(model_type.model_fields)
+    if unknown:
+        raise BadRequestError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    return tuple(name for name in model_type.model_fields if name in requested)
+
+
+def sparse_fields(model_type: type[BaseModel]) -> Callable[..., Fields]:
+    """
+    Dependency parsing the fields query parameter for a response model
+    """
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated fields to return "
+            f"({', '.join(model_type.model_fields)})",
+        ),
+    ) -> Fields:
+        return parse_fields(fields, model_type)
+
+    return dependency
+
+
+def load_fields(entity: Any, fields: Fields) -> List[Any]:
+    """
+    Loader options limiting the columns loaded for an entity to the fields
+
+    Returns no options (all columns) when fields is None.
+    """
+    if fields is None:
+        return []
+
+    names = dict.fromkeys((*VERSION_COLUMNS, *fields))
+    return [load_only(*(getattr(entity, name) for name in names))]
@@ -0,0 +1,45 @@
+from typing import AsyncIterable, AsyncIterator, Optional, Tuple
+
+
+async def read_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a byte stream into (line number, line) pairs as chunks arrive
+
+    Blank lines are skipped but counted. Lines longer than max_line_bytes are
+    yielded as None and never buffered in full, so memory stays bounded by the
+    chunk and line sizes regardless of the stream length.
+    """
+    buffer = b""
+    line_number = 0
+    # Whether the line currently being read already exceeded max_line_bytes
+    overflowed = False
+
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            line, start = buffer[start:end], end + 1
+            line_number += 1
+            if overflowed or len(line) > max_line_bytes:
+                overflowed = False
+                yield line_number, None
+            elif line.strip():
+                yield line_number, line
+
+        # Trim the consumed lines once per chunk rather than once per line
+        buffer = buffer[start:]
+
+        # Drop the buffered part of an over-long line, keep reading to its end
+        if len(buffer) > max_line_bytes:
+            overflowed = True
+            buffer = b""
+
+    if overflowed or len(buffer) > max_line_bytes:
+        yield line_number + 1, None
+    elif buffer.strip():
+        yield line_number + 1, buffer
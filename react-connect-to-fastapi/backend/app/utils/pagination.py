@@ -0,0 +1,30 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+from app.core.errors import BadRequestError
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """
+    Encode keyset values into an opaque, URL-safe cursor string
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise BadRequestError("Invalid pagination cursor")
+
+    if not isinstance(values, dict):
+        raise BadRequestError("Invalid pagination cursor")
+
+    return values
@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+"""
+End-to-end load benchmark of the API with concurrent httpx clients.
+Usage:
+    python -m benchmarks.bench_load [--url URL] [--concurrency N] [--requests N]
+        [--scenarios a,b] [--users N] [--items-per-user N] [--output FILE]
+        [--baseline FILE] [--threshold 0.2] [--save-baseline]
+
+Without --url the app runs in-process (httpx.ASGITransport, lifespan included)
+against a temporary SQLite database with the prod logging profile. With --url
+a running server is driven instead, e.g. `python run.py serve --prod`. Either
+way the dataset is seeded through the API: --users accounts that own
+--items-per-user items each.
+
+Every scenario runs --requests operations spread over --concurrency clients
+and reports RPS and p50/p95/p99 latency. Data a scenario consumes, e.g. the
+items bulk_delete removes, is created before its clock starts. The results are
+printed as JSON.
+With --baseline they are compared to a stored result, and the command exits
+with status 1 when a scenario's RPS drops or its p95 latency grows by more
+than --threshold. --save-baseline writes the results to the baseline file.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+API_V1_STR = "/api/v1"
+PASSWORD = "Password123"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "load_baseline.json")
+
+
+@dataclass
+class BenchUser:
+    username: str
+    headers: Dict[str, str]
+    item_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Dataset:
+    users: List[BenchUser]
+    total_items: int
+    # Items created ahead of the bulk_delete scenario, one batch per operation
+    delete_batches: List[Tuple[BenchUser, List[int]]] = field(default_factory=list)
+
+
+# A scenario performs one operation and returns its measured latency in seconds
+Scenario = Callable[[httpx.AsyncClient, BenchUser, Dataset], Awaitable[float]]
+# A setup prepares the data of a scenario's operations before it is timed
+Setup = Callable[[httpx.AsyncClient, Dataset, int], Awaitable[None]]
+
+BULK_DELETE_SIZE = 20
+
+
+def expect(response: httpx.Response, status_code: int) -> httpx.Response:
+    if response.status_code != status_code:
+        raise RuntimeError(
+            f"{response.request.method} {response.request.url.path} "
+            f"returned {response.status_code}, expected {status_code}"
+        )
+    return response
+
+
+async def timed(request: Awaitable[httpx.Response], status_code: int) -> float:
+    start = time.perf_counter()
+    expect(await request, status_code)
+    return time.perf_counter() - start
+
+
+async def login(client: httpx.AsyncClient, username: str) -> httpx.Response:
+    return await client.post(
+        f"{API_V1_STR}/auth/login",
+        data={"username": username, "password": PASSWORD},
+    )
+
+
+async def create_items(
+    client: httpx.AsyncClient, user: BenchUser, count: int, batch_size: int = 1000
+) -> List[int]:
+    ids: List[int] = []
+    for offset in range(0, count, batch_size):
+        items = [
+            {"title": f"Item {offset + i}", "description": f"Benchmark item {i}"}
+            for i in range(min(batch_size, count - offset))
+        ]
+        response = expect(
+            await client.post(
+                f"{API_V1_STR}/items/bulk",
+                json={"items": items},
+                headers=user.headers,
+                timeout=60.0,
+            ),
+            201,
+        )
+        ids.extend(result["id"] for result in response.json()["results"])
+    return ids
+
+
+async def seed(client: httpx.AsyncClient, users: int, items_per_user: int) -> Dataset:
+    """Register users and bulk create their items through the API"""
+    run_id = uuid.uuid4().hex[:8]
+    bench_users = []
+    for index in range(users):
+        username = f"bench_{run_id}_{index}"
+        expect(
+            await client.post(
+                f"{API_V1_STR}/auth/register",
+                json={
+                    "email": f"{username}@example.com",
+                    "username": username,
+                    "password": PASSWORD,
+                },
+            ),
+            201,
+        )
+        token = expect(await login(client, username), 200).json()["access_token"]
+        user = BenchUser(username, {"Authorization": f"Bearer {token}"})
+        user.item_ids = await create_items(client, user, items_per_user)
+        bench_users.append(user)
+
+    total = expect(
+        await client.get(f"{API_V1_STR}/items/", params={"limit": 1}), 200
+    ).json()["total"]
+    return Dataset(bench_users, total)
+
+
+async def scenario_login(client, user, dataset) -> float:
+    return await timed(login(client, user.username), 200)
+
+
+async def scenario_users_me(client, user, dataset) -> float:
+    return await timed(client.get(f"{API_V1_STR}/users/me", headers=user.headers), 200)
+
+
+def deep_page(dataset: Dataset, limit: int) -> int:
+    """Random page from the back half of the table, where OFFSET hurts the most"""
+    pages = max(1, (dataset.total_items + limit - 1) // limit)
+    return random.randint(pages // 2 + 1, pages) if pages > 1 else 1
+
+
+async def scenario_list_items_cached(client, user, dataset) -> float:
+    # After the first pass over the pages, the listing cache answers these
+    params = {"page": deep_page(dataset, 100), "limit": 100}
+    return await timed(client.get(f"{API_V1_STR}/items/", params=params), 200)
+
+
+async def scenario_list_items_deep(client, user, dataset) -> float:
+    # Reads routed to the primary bypass the listing cache, so every request
+    # runs the OFFSET query and the count
+    params = {"page": deep_page(dataset, 100), "limit": 100}
+    headers = {"X-Read-Consistency": "primary"}
+    return await timed(
+        client.get(f"{API_V1_STR}/items/", params=params, headers=headers), 200
+    )
+
+
+async def scenario_get_item(client, user, dataset) -> float:
+    item_id = random.choice(user.item_ids)
+    return await timed(client.get(f"{API_V1_STR}/items/{item_id}"), 200)
+
+
+async def scenario_create_update_delete(client, user, dataset) -> float:
+    start = time.perf_counter()
+    created = expect(
+        await client.post(
+            f"{API_V1_STR}/items/",
+            json={"title": "Load test item", "description": "created"},
+            headers=user.headers,
+        ),
+        201,
+    ).json()
+    expect(
+        await client.put(
+            f"{API_V1_STR}/items/{created['id']}",
+            json={"title": "Load test item", "description": "updated"},
+            headers=user.headers,
+        ),
+        200,
+    )
+    expect(
+        await client.delete(
+            f"{API_V1_STR}/items/{created['id']}", headers=user.headers
+        ),
+        204,
+    )
+    return time.perf_counter() - start
+
+
+async def setup_bulk_delete(client, dataset, requests) -> None:
+    # Spread the batches over the users so that deletes touch several owners
+    per_user = -(-requests // len(dataset.users))
+    for user in dataset.users:
+        ids = await create_items(client, user, per_user * BULK_DELETE_SIZE)
+        dataset.delete_batches.extend(
+            (user, ids[start : start + BULK_DELETE_SIZE])
+            for start in range(0, len(ids), BULK_DELETE_SIZE)
+        )
+    random.shuffle(dataset.delete_batches)
+
+
+async def scenario_bulk_delete(client, user, dataset) -> float:
+    # Deletes the items of a prepared batch as the user owning them
+    owner, ids = dataset.delete_batches.pop()
+    return await timed(
+        client.post(
+            f"{API_V1_STR}/items/bulk-delete",
+            json={"ids": ids},
+            headers=owner.headers,
+        ),
+        200,
+    )
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login": scenario_login,
+    "users_me": scenario_users_me,
+    "list_items_cached": scenario_list_items_cached,
+    "list_items_deep": scenario_list_items_deep,
+    "get_item": scenario_get_item,
+    "create_update_delete": scenario_create_update_delete,
+    "bulk_delete": scenario_bulk_delete,
+}
+
+SETUPS: Dict[str, Setup] = {
+    "bulk_delete": setup_bulk_delete,
+}
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    dataset: Dataset,
+    requests: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors: List[str] = []
+    remaining = iter(range(requests))
+
+    async def worker(index: int) -> None:
+        user = dataset.users[index % len(dataset.users)]
+        for _ in remaining:
+            try:
+                latencies.append(await scenario(client, user, dataset))
+            except (httpx.HTTPError, RuntimeError) as exc:
+                errors.append(str(exc))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    if errors:
+        print(f"  {len(errors)} errors, first: {errors[0]}", file=sys.stderr)
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def run_benchmark(
+    client: httpx.AsyncClient, args: argparse.Namespace
+) -> Dict[str, Dict[str, float]]:
+    print(f"seeding {args.users} users x {args.items_per_user} items", file=sys.stderr)
+    dataset = await seed(client, args.users, args.items_per_user)
+
+    results = {}
+    for name in args.scenarios:
+        print(f"running {name}", file=sys.stderr)
+        # bcrypt bound, so fewer operations keep the run short
+        requests = max(1, args.requests // 10) if name == "login" else args.requests
+        # Setup runs before the clock starts, so RPS covers only the operations
+        if name in SETUPS:
+            await SETUPS[name](client, dataset, requests)
+        results[name] = await run_scenario(
+            client, SCENARIOS[name], dataset, requests, args.concurrency
+        )
+    return results
+
+
+async def run_in_process(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    # Imported here so that DATABASE_URL and LOG_LEVEL set by main() apply
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=30.0
+        ) as client:
+            return await run_benchmark(client, args)
+
+
+async def run_against_url(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=30.0
+    ) as client:
+        return await run_benchmark(client, args)
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Return a description of every scenario that regressed past the threshold"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: rps {current['rps']} < baseline {previous['rps']}"
+            )
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']}ms > baseline {previous['p95_ms']}ms"
+            )
+        if current["errors"] > previous["errors"]:
+            regressions.append(
+                f"{name}: {current['errors']} errors > baseline {previous['errors']}"
+            )
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", help="Base URL of a running server")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--requests", type=int, default=1000, help="Operations per scenario"
+    )
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=list(SCENARIOS),
+        help=f"Comma separated subset of: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--items-per-user", type=int, default=2000)
+    parser.add_argument("--output", help="Also write the JSON results to a file")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative regression against the baseline",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Write the results to the baseline file",
+    )
+    args = parser.parse_args(argv)
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if args.baseline and not args.save_baseline and not os.path.exists(args.baseline):
+        parser.error(f"baseline file not found: {args.baseline}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    baseline_path = args.baseline or DEFAULT_BASELINE
+
+    if args.url:
+        results = asyncio.run(run_against_url(args))
+        target = args.url
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{directory}/load.db"
+            os.environ.setdefault("LOG_LEVEL", "WARNING")
+            os.environ.setdefault("LOG_MODE", "prod")
+            results = asyncio.run(run_in_process(args))
+        target = "in-process"
+
+    report = {
+        "target": target,
+        "concurrency": args.concurrency,
+        "users": args.users,
+        "items_per_user": args.items_per_user,
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    if args.save_baseline:
+        with open(baseline_path, "w") as f:
+            f.write(output + "\n")
+        print(f"baseline written to {baseline_path}", file=sys.stderr)
+        return 0
+
+    if args.baseline or os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)["scenarios"]
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions against {baseline_path}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
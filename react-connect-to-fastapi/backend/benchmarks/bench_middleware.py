@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Throughput benchmark for the request logging middleware.
+Usage:
+    python -m benchmarks.bench_middleware [requests] [concurrency]
+
+Serves /api/v1/health/ in-process through the pure ASGI RequestLoggingMiddleware
+and through the previous BaseHTTPMiddleware implementation, and reports RPS.
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+from typing import Callable
+
+import httpx
+from fastapi import FastAPI, Request
+from loguru import logger
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from app.api.routes.health import router as health_router
+from app.core.config import settings
+from app.core.middleware import RequestLoggingMiddleware
+
+
+class BaseHTTPRequestLoggingMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation the ASGI middleware replaced"""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        start_time = time.time()
+        logger.info(
+            f"Request started: {request.method} {request.url.path} (ID: {request_id})"
+        )
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        response.headers["X-Process-Time"] = str(process_time)
+        response.headers["X-Request-ID"] = request_id
+        logger.info(
+            f"Request completed: {request.method} {request.url.path} "
+            f"(ID: {request_id}) Status: {response.status_code} "
+            f"Time: {process_time:.3f}s"
+        )
+        return response
+
+
+def build_app(middleware_class: type) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware_class)
+    app.include_router(health_router, prefix=f"{settings.API_V1_STR}/health")
+    return app
+
+
+async def measure(app: FastAPI, requests: int, concurrency: int) -> float:
+    """Return requests per second for GET /api/v1/health/"""
+    transport = httpx.ASGITransport(app=app)
+    url = f"{settings.API_V1_STR}/health/"
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        # Warm up
+        for _ in range(50):
+            await client.get(url)
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                response = await client.get(url)
+                assert response.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(worker(requests // concurrency) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+
+    return (requests // concurrency * concurrency) / elapsed
+
+
+async def main(requests: int = 5_000, concurrency: int = 10) -> None:
+    # Keep the log formatting cost but not the terminal output
+    logger.remove()
+    logger.add(lambda _: None, level="INFO")
+
+    before = await measure(
+        build_app(BaseHTTPRequestLoggingMiddleware), requests, concurrency
+    )
+    after = await measure(build_app(RequestLoggingMiddleware), requests, concurrency)
+
+    print(f"requests: {requests}, concurrency: {concurrency}")
+    print(f"BaseHTTPMiddleware RPS: {before:10.1f}")
+    print(f"pure ASGI RPS:          {after:10.1f}")
+    print(f"change:                 {(after / before - 1) * 100:+9.1f}%")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 5_000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+        )
+    )
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Cold-start benchmark: time from process launch to the first served request.
+Usage:
+    python -m benchmarks.bench_startup [runs] [port]
+
+Starts uvicorn with app.main:app in a fresh process against a temporary SQLite
+database and polls /api/v1/health/ until it answers. The first run initializes
+the database, the following runs find it at the current schema version.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from app.core.config import settings
+
+
+def cold_start(port: int, database_url: str) -> float:
+    """Return seconds from launching uvicorn until the first 200 response"""
+    url = f"http://127.0.0.1:{port}{settings.API_V1_STR}/health/"
+    env = {**os.environ, "DATABASE_URL": database_url, "LOG_LEVEL": "WARNING"}
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError("uvicorn exited before serving a request")
+                try:
+                    if client.get(url).status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(runs: int = 5, port: int = 8765) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite+aiosqlite:///{directory}/startup.db"
+        timings = [cold_start(port, database_url) for _ in range(runs)]
+
+    print(f"runs: {runs}")
+    print(f"first start (initializes database): {timings[0]:.3f}s")
+    if runs > 1:
+        warm = timings[1:]
+        print(f"later starts median:                {statistics.median(warm):.3f}s")
+        print(f"later starts min:                   {min(warm):.3f}s")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8765,
+    )
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark for access token verification.
+Usage:
+    python -m benchmarks.bench_token_cache [iterations]
+
+Compares a full HS256 verification plus TokenPayload construction on every call
+against decode_access_token serving a repeated bearer token from the cache.
+"""
+
+import sys
+import timeit
+
+from jose import jwt
+
+from app.core.config import settings
+from app.core.security import create_access_token, decode_access_token, token_cache
+from app.schemas.token import TokenPayload
+
+
+def uncached_decode(token: str) -> TokenPayload:
+    """Verify the token the way get_current_user did before the cache"""
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    return TokenPayload(**payload)
+
+
+def main(iterations: int = 20_000) -> None:
+    token = create_access_token(subject=1)
+    token_cache.clear()
+
+    uncached = timeit.timeit(lambda: uncached_decode(token), number=iterations)
+    cached = timeit.timeit(lambda: decode_access_token(token), number=iterations)
+
+    uncached_us = uncached / iterations * 1e6
+    cached_us = cached / iterations * 1e6
+    print(f"iterations:            {iterations}")
+    print(f"uncached per request:  {uncached_us:8.2f} us")
+    print(f"cached per request:    {cached_us:8.2f} us")
+    print(f"saving per request:    {uncached_us - cached_us:8.2f} us")
+    print(f"speedup:               {uncached_us / cached_us:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -4,28 +4,61 @@ Helper script to initialize the database and start the application.
 Usage:
     # Initialize the database
     python run.py init-db
-    
-    # Run the application
+
+    # Apply pending schema migrations only
+    python run.py migrate
+
+    # Run the application (development, with reload)
     python run.py serve
+
+    # Run the application with one worker per CPU core (production)
+    python run.py serve --prod
+
+With several workers, --prod shares metrics through METRICS_MULTIPROC_DIR and
+cache invalidations through CACHE_INVALIDATION_DIR (temporary directories unless
+set), so a user deleted or deactivated in one worker is rejected by all of
+them on their next request. Running `uvicorn --workers N` directly without
+CACHE_INVALIDATION_DIR leaves each worker's caches stale for up to
+USER_CACHE_TTL_SECONDS and ITEM_LISTING_CACHE_TTL_SECONDS.
 """
 
 import asyncio
+import importlib.util
+import inspect
 import os
 import sys
+import tempfile
 
 import uvicorn
 from loguru import logger
 
+from app.core.config import settings, setup_logging
+from app.core.db import dispose_engines, engine
 from app.core.init_db import init_db
+from app.core.metrics import reset_multiproc_dir
+from app.core.migrations import run_migrations
 
 
 async def initialize_database():
     """Initialize the database with tables and initial data"""
     logger.info("Initializing database...")
-    await init_db()
+    try:
+        await init_db()
+    finally:
+        await dispose_engines()
     logger.info("Database initialization complete.")
 
 
+async def migrate_database():
+    """Apply pending schema migrations to an existing database"""
+    logger.info("Running database migrations...")
+    try:
+        await run_migrations(engine)
+    finally:
+        await dispose_engines()
+    logger.info("Database migrations complete.")
+
+
 def serve():
     """Start the FastAPI application with uvicorn"""
     logger.info("Starting FastAPI application...")
@@ -38,18 +71,82 @@ def serve():
     )
 
 
+def worker_count() -> int:
+    """Configured worker count, or one worker per CPU core available to us"""
+    return settings.WEB_CONCURRENCY or os.process_cpu_count() or 1
+
+
+def serve_prod():
+    """Start the FastAPI application with multiple uvicorn workers"""
+    workers = worker_count()
+
+    # Initialize the database once here instead of racing in every worker
+    asyncio.run(initialize_database())
+    os.environ["INIT_DB_ON_STARTUP"] = "false"
+
+    # Workers are separate processes: merge their metrics through files and
+    # propagate cache invalidations through shared generation counters
+    if workers > 1:
+        metrics_dir = settings.METRICS_MULTIPROC_DIR or tempfile.mkdtemp(
+            prefix="app-metrics-"
+        )
+        reset_multiproc_dir(metrics_dir)
+        os.environ["METRICS_MULTIPROC_DIR"] = metrics_dir
+        os.environ["CACHE_INVALIDATION_DIR"] = (
+            settings.CACHE_INVALIDATION_DIR or tempfile.mkdtemp(prefix="app-cache-")
+        )
+
+    # uvloop and httptools when installed (uvicorn[standard]), else pure Python
+    has_uvloop = importlib.util.find_spec("uvloop") is not None
+    has_httptools = importlib.util.find_spec("httptools") is not None
+
+    # Staggered recycling needs a uvicorn release with per-worker jitter
+    recycling = {"limit_max_requests": settings.SERVER_MAX_REQUESTS}
+    if "limit_max_requests_jitter" in inspect.signature(uvicorn.Config).parameters:
+        recycling["limit_max_requests_jitter"] = settings.SERVER_MAX_REQUESTS_JITTER
+
+    logger.info(
+        "Starting FastAPI application with {} workers (loop: {}, http: {})...",
+        workers,
+        "uvloop" if has_uvloop else "asyncio",
+        "httptools" if has_httptools else "h11",
+    )
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop="uvloop" if has_uvloop else "asyncio",
+        http="httptools" if has_httptools else "h11",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        **recycling,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        # Requests are already logged by RequestLoggingMiddleware
+        access_log=False,
+        log_level="info",
+    )
+
+
 if __name__ == "__main__":
+    setup_logging()
+
     if len(sys.argv) < 2:
-        print("Please provide a command: init-db or serve")
+        print("Please provide a command: init-db, migrate or serve")
         sys.exit(1)
 
     command = sys.argv[1]
 
     if command == "init-db":
         asyncio.run(initialize_database())
+    elif command == "migrate":
+        asyncio.run(migrate_database())
     elif command == "serve":
-        serve()
+        if "--prod" in sys.argv[2:]:
+            serve_prod()
+        else:
+            serve()
     else:
         print(f"Unknown command: {command}")
-        print("Available commands: init-db, serve")
+        print("Available commands: init-db, migrate, serve")
         sys.exit(1)
@@ -1,5 +1,6 @@
 import asyncio
 import os
+import uuid
 from typing import AsyncGenerator, Generator
 
 import pytest
@@ -11,7 +12,9 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
-from app.core.db import Base, get_db
+from app.core.db import Base, get_db, get_read_db, get_read_session_maker
+from app.core.instrumentation import instrument_engine
+from app.core.migrations import run_migrations
 from app.main import create_application
 from app.models.item import Item
 
@@ -57,6 +60,7 @@ async def setup_test_db():
         future=True,
         connect_args={"check_same_thread": False},
     )
+    instrument_engine(test_engine)
 
     # Create session factory
     TestingSessionLocal = sessionmaker(
@@ -75,6 +79,9 @@ async def setup_test_db():
             )
         )
 
+    # Apply migrations (indexes, full-text search) like init_db does
+    await run_migrations(test_engine)
+
     yield
 
     # Clean up after tests
@@ -108,8 +115,10 @@ async def test_app(test_db_session) -> FastAPI:
     async def get_test_db():
         yield test_db_session
 
-    # Override the get_db dependency
+    # Override the database dependencies
     app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_read_db] = get_test_db
+    app.dependency_overrides[get_read_session_maker] = lambda: TestingSessionLocal
 
     return app
 
@@ -120,3 +129,53 @@ def client(test_app) -> TestClient:
     Create a synchronous test client for the test app.
     """
     return TestClient(test_app)
+
+
+def create_user_headers(client: TestClient) -> dict:
+    """
+    Register a fresh user and return bearer auth headers for it.
+    """
+    username = f"user_{uuid.uuid4().hex[:12]}"
+    password = "Password123"
+
+    client.post(
+        f"{settings.API_V1_STR}/auth/register",
+        json={
+            "email": f"{username}@example.com",
+            "username": username,
+            "password": password,
+        },
+    )
+    login_response = client.post(
+        f"{settings.API_V1_STR}/auth/login",
+        data={"username": username, "password": password},
+    )
+    token = login_response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def auth_headers(client: TestClient) -> dict:
+    """
+    Auth headers of a freshly registered user.
+    """
+    return create_user_headers(client)
+
+
+@pytest.fixture
+def other_auth_headers(client: TestClient) -> dict:
+    """
+    Auth headers of a second, unrelated user.
+    """
+    return create_user_headers(client)
+
+
+@pytest.fixture
+def current_user_id(client: TestClient, auth_headers: dict) -> int:
+    """
+    Id of the user behind auth_headers.
+    """
+    return client.get(f"{settings.API_V1_STR}/users/me", headers=auth_headers).json()[
+        "id"
+    ]
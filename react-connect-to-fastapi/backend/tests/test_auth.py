@@ -1,6 +1,10 @@
+from datetime import timedelta
+
 from fastapi.testclient import TestClient
 
 from app.core.config import settings
+from app.core.security import create_access_token, decode_access_token, token_cache
+from app.services.user import user_cache
 
 
 def test_user_registration_and_login(client: TestClient):
@@ -47,3 +51,84 @@ def test_user_registration_and_login(client: TestClient):
     assert me_response.status_code == 200
     assert me_response.json()["email"] == user_data["email"]
     assert me_response.json()["username"] == user_data["username"]
+
+
+def test_current_user_cache_invalidated_on_update(
+    client: TestClient, auth_headers: dict
+):
+    """
+    Test repeated authenticated requests hit the user cache and updates still apply
+    """
+    stats_url = f"{settings.API_V1_STR}/health/caches"
+    me_url = f"{settings.API_V1_STR}/users/me"
+
+    client.get(me_url, headers=auth_headers)
+    hits_before = client.get(stats_url).json()["user"]["hits"]
+
+    client.get(me_url, headers=auth_headers)
+    assert client.get(stats_url).json()["user"]["hits"] == hits_before + 1
+
+    update_response = client.put(
+        me_url, json={"full_name": "Renamed User"}, headers=auth_headers
+    )
+    assert update_response.status_code == 200
+
+    me_response = client.get(me_url, headers=auth_headers)
+    assert me_response.json()["full_name"] == "Renamed User"
+
+    # Deactivation must apply right away, not after the cache TTL
+    client.put(me_url, json={"is_active": False}, headers=auth_headers)
+    assert client.get(me_url, headers=auth_headers).status_code == 401
+
+
+def test_user_if_match_checks_the_stored_version(
+    client: TestClient, auth_headers: dict, current_user_id: int
+):
+    """
+    Test If-Match on the current user is compared against the database, not a
+    cached copy of the user that may be stale
+    """
+    me_url = f"{settings.API_V1_STR}/users/me"
+    etag = client.get(me_url, headers=auth_headers).headers["ETag"]
+    stale_user = user_cache.get(current_user_id)
+
+    client.put(me_url, json={"full_name": "First"}, headers=auth_headers)
+    # Another worker's cache still holds the user as it was before the update
+    user_cache.set(current_user_id, stale_user)
+
+    stale_update = client.put(
+        me_url,
+        json={"full_name": "Second"},
+        headers={**auth_headers, "If-Match": etag},
+    )
+    assert stale_update.status_code == 412
+
+    user_cache.clear()
+    assert client.get(me_url, headers=auth_headers).json()["full_name"] == "First"
+
+
+def test_access_token_verification_is_cached():
+    """
+    Test a verified token is served from the cache on repeated decodes
+    """
+    token = create_access_token(subject=42)
+
+    hits_before = token_cache.hits
+    assert decode_access_token(token).user_id == 42
+    assert decode_access_token(token).user_id == 42
+
+    assert token_cache.hits == hits_before + 1
+
+
+def test_expired_access_token_is_rejected(client: TestClient):
+    """
+    Test an expired token never authenticates
+    """
+    token = create_access_token(subject=1, expires_delta=timedelta(seconds=-1))
+
+    response = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 401
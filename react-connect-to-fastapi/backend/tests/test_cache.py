@@ -0,0 +1,76 @@
+from app.core.cache import (
+    CachedResponse,
+    InMemoryResponseCache,
+    SharedGenerations,
+    TTLCache,
+)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """
+    Test the TTL cache stays within its size bound and counts hits and misses
+    """
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats() == {"hits": 2, "misses": 1, "size": 2, "max_size": 2}
+
+
+def test_response_cache_byte_budget_and_namespaces():
+    """
+    Test the response cache evicts by bytes and invalidates whole namespaces
+    """
+    cache = InMemoryResponseCache(max_bytes=10, ttl=60)
+    page = CachedResponse(b"12345", '"etag"')
+
+    cache.set(1, "p1", page, cache.version(1))
+    cache.set(2, "p1", page, cache.version(2))
+    cache.set(2, "p2", page, cache.version(2))
+
+    assert cache.get(1, "p1") is None
+    assert cache.stats()["size"] == 10
+
+    version = cache.version(2)
+    cache.invalidate(2)
+    assert cache.get(2, "p2") is None
+
+    # A page computed before the invalidation is never stored
+    cache.set(2, "p2", page, version)
+    assert cache.get(2, "p2") is None
+
+
+def test_invalidations_are_shared_between_workers(tmp_path):
+    """
+    Test caches of two workers sharing generations drop each other's entries
+    """
+    path = str(tmp_path / "users.gen")
+    worker_a = TTLCache(max_size=10, ttl=60, generations=SharedGenerations(path))
+    worker_b = TTLCache(max_size=10, ttl=60, generations=SharedGenerations(path))
+    worker_a.set(1, "alice")
+    worker_b.set(1, "alice")
+    worker_b.set(2, "bob")
+
+    # Loaded by worker b before worker a invalidated it, so never stored
+    generation = worker_b.generation(1)
+    worker_a.invalidate(1)
+    assert worker_b.get(1) is None
+    assert worker_b.get(2) == "bob"
+    worker_b.set(1, "alice (stale)", generation=generation)
+    assert worker_b.get(1) is None
+
+    page = CachedResponse(b"page", '"etag"')
+    path = str(tmp_path / "listings.gen")
+    listings_a = InMemoryResponseCache(
+        max_bytes=100, ttl=60, generations=SharedGenerations(path)
+    )
+    listings_b = InMemoryResponseCache(
+        max_bytes=100, ttl=60, generations=SharedGenerations(path)
+    )
+    listings_b.set("all", "p1", page, listings_b.version("all"))
+    listings_a.invalidate("all")
+    assert listings_b.get("all", "p1") is None
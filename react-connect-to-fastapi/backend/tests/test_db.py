@@ -0,0 +1,222 @@
+import asyncio
+import re
+import time
+
+import pytest
+from loguru import logger
+from sqlalchemy import exc, inspect, text
+from sqlalchemy.engine import make_url
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.db import (
+    READ_AFTER_WRITE_COOKIE,
+    READ_CONSISTENCY_HEADER,
+    Base,
+    create_engine,
+    is_sqlite_file,
+    sqlite_read_only_url,
+    use_read_engine,
+)
+from app.core.instrumentation import track_queries
+from app.core.migrations import (
+    MIGRATIONS,
+    get_stored_fingerprint,
+    run_migrations,
+    schema_fingerprint,
+    store_fingerprint,
+)
+
+
+def test_sqlite_read_only_url():
+    """
+    Test reader connections open the same SQLite file in read-only URI mode
+    """
+    url = make_url("sqlite+aiosqlite:///./app.db")
+    read_only = sqlite_read_only_url(url)
+
+    assert is_sqlite_file(url)
+    assert read_only.database == "file:./app.db"
+    assert read_only.query == {"mode": "ro", "uri": "true"}
+    assert not is_sqlite_file(make_url("sqlite+aiosqlite:///:memory:"))
+
+
+def make_request(method: str = "GET", headers: dict = None) -> Request:
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": method, "headers": raw_headers})
+
+
+def test_read_routing_rules():
+    """
+    Test reads go to the read engine unless the client needs its own writes
+    """
+    recent_write = f"{READ_AFTER_WRITE_COOKIE}={time.time() + 5}"
+    old_write = f"{READ_AFTER_WRITE_COOKIE}={time.time() - 5}"
+
+    assert use_read_engine(make_request())
+    assert use_read_engine(make_request(headers={"Cookie": old_write}))
+    assert not use_read_engine(make_request("POST"))
+    assert not use_read_engine(make_request(headers={"Cookie": recent_write}))
+    assert not use_read_engine(
+        make_request(headers={READ_CONSISTENCY_HEADER: "primary"})
+    )
+
+
+async def test_pool_records_checkout_timeouts(tmp_path, monkeypatch):
+    """
+    Test the instrumented pool counts checkouts and checkout timeouts
+    """
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.05)
+    engine = create_engine(
+        make_url(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"),
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    try:
+        async with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+        stats = engine.pool.stats()
+        assert stats["checkouts"] == 2
+        assert stats["timeouts"] == 1
+        assert stats["checked_out"] == 0
+        assert stats["wait_max"] >= 0.05
+    finally:
+        await engine.dispose()
+
+
+async def test_query_instrumentation(tmp_path, monkeypatch):
+    """
+    Test statements are attributed to the tracked request, slow statements are
+    logged with their non-sensitive parameters and repeated statements warn
+    about N+1 queries
+    """
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.0)
+    monkeypatch.setattr(settings, "N_PLUS_ONE_THRESHOLD", 2)
+    messages = []
+    sink_id = logger.add(
+        lambda message: messages.append(message.record["message"]), level="WARNING"
+    )
+    engine = create_engine(
+        make_url(f"sqlite+aiosqlite:///{tmp_path}/instrumented.db"),
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    try:
+        with track_queries("request-1") as stats:
+            async with engine.connect() as conn:
+                for value in range(3):
+                    await conn.execute(text("SELECT :value"), {"value": value})
+
+        async with engine.connect() as conn:
+            await conn.execute(
+                text("SELECT :username, :hashed_password"),
+                {"username": "alice", "hashed_password": "$2b$12$secret"},
+            )
+    finally:
+        logger.remove(sink_id)
+        await engine.dispose()
+
+    assert stats.count == 3
+    assert stats.slowest_statement == "SELECT ?"
+    assert stats.duration >= stats.slowest_duration > 0
+    slow = [m for m in messages if m.startswith("Slow query")]
+    assert len(slow) == 4 and "Parameters: (2,)" in slow[2]
+    assert "('alice', '<redacted>')" in slow[-1] and "secret" not in slow[-1]
+    n_plus_one = [m for m in messages if m.startswith("Possible N+1")]
+    assert len(n_plus_one) == 1
+
+
+def test_request_server_timing(client, auth_headers):
+    """
+    Test responses report the request's query count and DB time
+    """
+    response = client.get(f"{settings.API_V1_STR}/users/me", headers=auth_headers)
+
+    assert re.fullmatch(
+        r'db;dur=\d+\.\d{3};desc="\d+ queries"', response.headers["Server-Timing"]
+    )
+
+
+async def test_migrations_add_indexes_to_existing_database(tmp_path):
+    """
+    Test pending migrations create missing indexes once and record their version
+    """
+    engine = create_engine(
+        make_url(f"sqlite+aiosqlite:///{tmp_path}/legacy.db"),
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    def index_names(conn):
+        return {index["name"] for index in inspect(conn).get_indexes("items")}
+
+    try:
+        # A database created before the indexes existed
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text("DROP INDEX ix_items_owner_id_id"))
+            await conn.execute(text("DROP INDEX ix_items_created_at_id"))
+
+        assert await run_migrations(engine) == [m.version for m in MIGRATIONS]
+        assert await run_migrations(engine) == []
+
+        async with engine.connect() as conn:
+            indexes = await conn.run_sync(index_names)
+            versions = (
+                await conn.execute(text("SELECT version FROM schema_migrations"))
+            ).scalars()
+            assert list(versions) == [m.version for m in MIGRATIONS]
+    finally:
+        await engine.dispose()
+
+    assert {"ix_items_owner_id_id", "ix_items_created_at_id"} <= indexes
+
+
+async def test_concurrent_migrations_apply_each_version_once(tmp_path):
+    """
+    Test workers migrating the same database at once neither fail nor repeat
+    """
+    url = make_url(f"sqlite+aiosqlite:///{tmp_path}/shared.db")
+    engines = [create_engine(url, pool_size=1, max_overflow=0) for _ in range(4)]
+
+    try:
+        async with engines[0].begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        results = await asyncio.gather(
+            *(run_migrations(e) for e in engines), return_exceptions=True
+        )
+    finally:
+        for engine in engines:
+            await engine.dispose()
+
+    assert not [r for r in results if isinstance(r, Exception)]
+    applied = sorted(version for result in results for version in result)
+    assert applied == [m.version for m in MIGRATIONS]
+
+
+async def test_schema_fingerprint_roundtrip(tmp_path):
+    """
+    Test the fingerprint init_db compares against is missing until stored
+    """
+    engine = create_engine(
+        make_url(f"sqlite+aiosqlite:///{tmp_path}/fingerprint.db"),
+        pool_size=1,
+        max_overflow=0,
+    )
+    fingerprint = schema_fingerprint(engine.dialect)
+
+    try:
+        assert await get_stored_fingerprint(engine) is None
+        await store_fingerprint(engine, fingerprint)
+        await store_fingerprint(engine, fingerprint)
+        assert await get_stored_fingerprint(engine) == fingerprint
+    finally:
+        await engine.dispose()
+
+    assert schema_fingerprint(engine.dialect) == fingerprint
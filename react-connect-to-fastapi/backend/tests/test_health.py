@@ -1,4 +1,5 @@
 from fastapi.testclient import TestClient
+from loguru import logger
 
 from app.core.config import settings
 
@@ -11,3 +12,34 @@ def test_health_check(client: TestClient):
 
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_request_tracing_headers(client: TestClient):
+    """
+    Test every response carries the request id and processing time headers
+    """
+    response = client.get(f"{settings.API_V1_STR}/health/")
+
+    assert len(response.headers["X-Request-ID"]) == 36
+    assert float(response.headers["X-Process-Time"]) >= 0
+
+
+def test_request_log_sampling(client: TestClient, monkeypatch):
+    """
+    Test unsampled successful requests are not logged while errors always are
+    """
+    monkeypatch.setattr(settings, "LOG_SAMPLE_RATE", 0.0)
+    messages = []
+    sink_id = logger.add(lambda message: messages.append(message.record), level="INFO")
+
+    try:
+        client.get(f"{settings.API_V1_STR}/health/")
+        client.get(f"{settings.API_V1_STR}/items/999999999/missing")
+    finally:
+        logger.remove(sink_id)
+
+    completed = [
+        record for record in messages if record["message"].startswith("Request")
+    ]
+    assert [record["extra"]["status"] for record in completed] == [404]
+    assert completed[0]["extra"]["request_id"]
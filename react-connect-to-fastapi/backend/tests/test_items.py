@@ -0,0 +1,500 @@
+import csv
+import io
+import json
+import re
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+
+from app.core.config import settings
+from app.models.item import Item
+from app.services.item import ItemService
+from app.utils.export import EXPORT_FIELDS
+from app.utils.ndjson import read_lines
+
+ITEMS_URL = f"{settings.API_V1_STR}/items/"
+
+
+def create_items(client: TestClient, headers: dict, count: int) -> list:
+    """
+    Create a number of items for the authenticated user and return their ids
+    """
+    return [
+        client.post(ITEMS_URL, json={"title": f"Item {i}"}, headers=headers).json()[
+            "id"
+        ]
+        for i in range(count)
+    ]
+
+
+def test_list_items_cursor_pagination(
+    client: TestClient, auth_headers: dict, current_user_id: int
+):
+    """
+    Test keyset pagination walks every item exactly once without a total count
+    """
+    item_ids = create_items(client, auth_headers, 5)
+
+    seen = []
+    params = {"owner_id": current_user_id, "limit": 2, "mode": "cursor"}
+    while True:
+        response = client.get(ITEMS_URL, params=params)
+        assert response.status_code == 200
+        body = response.json()
+        assert "total" not in body
+        seen.extend(item["id"] for item in body["items"])
+        if not body["has_more"]:
+            assert body["next_cursor"] is None
+            break
+        params = {
+            "owner_id": current_user_id,
+            "limit": 2,
+            "cursor": body["next_cursor"],
+        }
+
+    assert seen == item_ids
+
+
+def test_list_items_invalid_cursor(client: TestClient):
+    """
+    Test a malformed cursor is rejected
+    """
+    response = client.get(ITEMS_URL, params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json()["error"] == "bad_request"
+
+
+def test_list_items_offset_pagination(
+    client: TestClient, auth_headers: dict, current_user_id: int
+):
+    """
+    Test the default page-based pagination still reports totals
+    """
+    create_items(client, auth_headers, 3)
+
+    response = client.get(ITEMS_URL, params={"owner_id": current_user_id, "limit": 2})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3
+    assert body["pages"] == 2
+    assert len(body["items"]) == 2
+
+
+def test_bulk_delete_items(
+    client: TestClient, auth_headers: dict, other_auth_headers: dict
+):
+    """
+    Test bulk delete only removes the caller's items and reports the rest as failed
+    """
+    own_ids = create_items(client, auth_headers, 2)
+    other_ids = create_items(client, other_auth_headers, 1)
+
+    response = client.post(
+        f"{ITEMS_URL}bulk-delete",
+        json={"ids": [own_ids[0], other_ids[0], 999_999_999, own_ids[1], own_ids[0]]},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "deleted_ids": own_ids,
+        "failed_ids": [other_ids[0], 999_999_999],
+    }
+    assert client.get(f"{ITEMS_URL}{other_ids[0]}").status_code == 200
+
+
+def test_bulk_create_and_update_items(
+    client: TestClient, auth_headers: dict, other_auth_headers: dict
+):
+    """
+    Test bulk create and bulk update return per-entry results in request order
+    """
+    create_response = client.post(
+        f"{ITEMS_URL}bulk",
+        json={"items": [{"title": "Bulk A"}, {"title": "Bulk B", "description": "b"}]},
+        headers=auth_headers,
+    )
+
+    assert create_response.status_code == 201
+    results = create_response.json()["results"]
+    assert [result["success"] for result in results] == [True, True]
+    first_id, second_id = results[0]["id"], results[1]["id"]
+    assert client.get(f"{ITEMS_URL}{second_id}").json()["description"] == "b"
+
+    other_id = create_items(client, other_auth_headers, 1)[0]
+
+    update_response = client.patch(
+        f"{ITEMS_URL}bulk",
+        json={
+            "items": [
+                {"id": first_id, "title": "Bulk A2"},
+                {"id": other_id, "title": "Not mine"},
+                {"id": 999_999_999, "title": "Missing"},
+                {"id": second_id, "title": None},
+                {"id": second_id, "description": "b2"},
+            ]
+        },
+        headers=auth_headers,
+    )
+
+    assert update_response.status_code == 200
+    assert update_response.json()["results"] == [
+        {"id": first_id, "success": True, "error": None},
+        {"id": other_id, "success": False, "error": "permission_denied"},
+        {"id": 999_999_999, "success": False, "error": "not_found"},
+        {"id": second_id, "success": False, "error": "title_required"},
+        {"id": second_id, "success": True, "error": None},
+    ]
+    assert client.get(f"{ITEMS_URL}{first_id}").json()["title"] == "Bulk A2"
+    second = client.get(f"{ITEMS_URL}{second_id}").json()
+    assert (second["title"], second["description"]) == ("Bulk B", "b2")
+    assert client.get(f"{ITEMS_URL}{other_id}").json()["title"] == "Item 0"
+
+
+def test_get_item_response_and_not_found(client: TestClient, auth_headers: dict):
+    """
+    Test single-pass item serialization and the missing item error
+    """
+    item_id = create_items(client, auth_headers, 1)[0]
+
+    response = client.get(f"{ITEMS_URL}{item_id}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert set(response.json()) == {
+        "id",
+        "title",
+        "description",
+        "owner_id",
+        "created_at",
+        "updated_at",
+    }
+    assert client.get(f"{ITEMS_URL}999999999").status_code == 404
+
+
+def test_item_conditional_requests(client: TestClient, auth_headers: dict):
+    """
+    Test If-None-Match returns 304 and If-Match rejects stale writes
+    """
+    item_id = create_items(client, auth_headers, 1)[0]
+    item_url = f"{ITEMS_URL}{item_id}"
+
+    etag = client.get(item_url).headers["ETag"]
+    not_modified = client.get(item_url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    update_response = client.put(
+        item_url,
+        json={"title": "Renamed"},
+        headers={**auth_headers, "If-Match": etag},
+    )
+    assert update_response.status_code == 200
+    new_etag = update_response.headers["ETag"]
+    assert new_etag != etag
+
+    stale_update = client.put(
+        item_url,
+        json={"title": "Lost update"},
+        headers={**auth_headers, "If-Match": etag},
+    )
+    assert stale_update.status_code == 412
+    assert client.get(item_url, headers={"If-None-Match": etag}).status_code == 200
+    assert client.get(item_url).json()["title"] == "Renamed"
+
+
+def test_list_items_etag(client: TestClient, auth_headers: dict, current_user_id: int):
+    """
+    Test the listing fingerprint changes when the page changes
+    """
+    create_items(client, auth_headers, 2)
+    params = {"owner_id": current_user_id}
+
+    etag = client.get(ITEMS_URL, params=params).headers["ETag"]
+    assert (
+        client.get(ITEMS_URL, params=params, headers={"If-None-Match": etag})
+    ).status_code == 304
+
+    create_items(client, auth_headers, 1)
+    assert (
+        client.get(ITEMS_URL, params=params, headers={"If-None-Match": etag})
+    ).status_code == 200
+
+
+def test_list_items_cache_invalidated_per_owner(
+    client: TestClient,
+    auth_headers: dict,
+    other_auth_headers: dict,
+    current_user_id: int,
+):
+    """
+    Test cached listing pages are reused and dropped when the owner writes
+    """
+    item_id = create_items(client, auth_headers, 1)[0]
+    params = {"owner_id": current_user_id}
+    stats_url = f"{settings.API_V1_STR}/health/caches"
+
+    first = client.get(ITEMS_URL, params=params)
+    hits_before = client.get(stats_url).json()["item_listing"]["hits"]
+    second = client.get(ITEMS_URL, params=params)
+    assert client.get(stats_url).json()["item_listing"]["hits"] == hits_before + 1
+    assert second.content == first.content
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+    # Another owner's writes leave this owner's pages cached
+    create_items(client, other_auth_headers, 1)
+    client.get(ITEMS_URL, params=params)
+    assert client.get(stats_url).json()["item_listing"]["hits"] == hits_before + 2
+
+    client.put(f"{ITEMS_URL}{item_id}", json={"title": "Changed"}, headers=auth_headers)
+    assert client.get(ITEMS_URL, params=params).json()["items"][0]["title"] == "Changed"
+
+
+def test_search_items(
+    client: TestClient, auth_headers: dict, other_auth_headers: dict, current_user_id
+):
+    """
+    Test full-text search ranking, keyset pagination, owner scope and index sync
+    """
+    word = f"kw{uuid.uuid4().hex[:10]}"
+    search_url = f"{ITEMS_URL}search"
+    best = client.post(
+        ITEMS_URL,
+        json={"title": f"{word} {word}", "description": word},
+        headers=auth_headers,
+    ).json()
+    other = client.post(
+        ITEMS_URL,
+        json={
+            "title": "Other",
+            "description": f"Mentions {word} once among many words",
+        },
+        headers=other_auth_headers,
+    ).json()
+
+    # Best match first, one item per page
+    first = client.get(search_url, params={"q": word, "limit": 1}).json()
+    assert [item["id"] for item in first["items"]] == [best["id"]]
+    assert first["has_more"] is True
+    second = client.get(
+        search_url, params={"q": word, "limit": 1, "cursor": first["next_cursor"]}
+    ).json()
+    assert [item["id"] for item in second["items"]] == [other["id"]]
+    assert second["has_more"] is False
+
+    scoped = client.get(search_url, params={"q": word, "owner_id": current_user_id})
+    assert [item["id"] for item in scoped.json()["items"]] == [best["id"]]
+
+    # Syntax characters are matched literally instead of failing
+    assert client.get(search_url, params={"q": f'{word} "OR ('}).status_code == 200
+
+    # Updates and deletes are reflected in the index
+    client.put(
+        f"{ITEMS_URL}{best['id']}",
+        json={"title": "Renamed", "description": None},
+        headers=auth_headers,
+    )
+    client.delete(f"{ITEMS_URL}{other['id']}", headers=other_auth_headers)
+    assert client.get(search_url, params={"q": word}).json()["items"] == []
+
+
+def test_export_items(
+    client: TestClient,
+    auth_headers: dict,
+    other_auth_headers: dict,
+    current_user_id: int,
+    monkeypatch,
+):
+    """
+    Test NDJSON and CSV exports stream all of an owner's items in id order
+    """
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    ids = create_items(client, auth_headers, 5)
+    create_items(client, other_auth_headers, 1)
+
+    response = client.get(f"{ITEMS_URL}export", params={"owner_id": current_user_id})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ids
+    assert rows[0]["title"] == "Item 0" and rows[0]["owner_id"] == current_user_id
+
+    response = client.get(
+        f"{ITEMS_URL}export", params={"owner_id": current_user_id, "format": "csv"}
+    )
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == list(EXPORT_FIELDS)
+    assert [int(row[0]) for row in rows[1:]] == ids
+
+
+def test_import_items(
+    client: TestClient, auth_headers: dict, current_user_id: int, monkeypatch
+):
+    """
+    Test NDJSON imports insert valid lines in batches and report rejected lines
+    """
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "IMPORT_MAX_LINE_BYTES", 200)
+    monkeypatch.setattr(settings, "IMPORT_MAX_ERRORS", 2)
+    lines = [
+        json.dumps({"title": "Imported 1", "description": "First"}),
+        "",
+        json.dumps({"title": "Imported 2"}),
+        "{not json",
+        json.dumps({"title": ""}),
+        json.dumps({"title": "x" * 300}),
+        json.dumps({"title": "Imported 3"}),
+    ]
+
+    response = client.post(
+        f"{ITEMS_URL}import",
+        content="\n".join(lines).encode(),
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["accepted"] == 3
+    assert summary["rejected"] == 3
+    assert [error["line"] for error in summary["errors"]] == [4, 5]
+    assert summary["errors"][1]["error"].startswith("title:")
+
+    exported = client.get(f"{ITEMS_URL}export", params={"owner_id": current_user_id})
+    titles = [json.loads(line)["title"] for line in exported.text.splitlines()]
+    assert titles == ["Imported 1", "Imported 2", "Imported 3"]
+
+
+async def test_read_lines_bounds_long_lines():
+    """
+    Test over-long lines spanning several chunks are rejected, not buffered,
+    and lines split across chunks are joined
+    """
+    stream = (b'{"a": 1}\n' + b"x" * 30, b"y" * 30, b"\n", b"ok\n\nsp", b"lit\nlast")
+
+    async def chunks():
+        for chunk in stream:
+            yield chunk
+
+    lines = [line async for line in read_lines(chunks(), max_line_bytes=20)]
+
+    assert lines == [
+        (1, b'{"a": 1}'),
+        (2, None),
+        (3, b"ok"),
+        (5, b"split"),
+        (6, b"last"),
+    ]
+
+
+def test_sparse_fieldsets(client: TestClient, auth_headers: dict, current_user_id: int):
+    """
+    Test fields= limits responses (and loaded columns) to the requested fields
+    """
+    item_id = create_items(client, auth_headers, 1)[0]
+
+    item = client.get(f"{ITEMS_URL}{item_id}", params={"fields": "title,id"})
+    assert item.json() == {"id": item_id, "title": "Item 0"}
+    assert item.headers["ETag"]
+
+    page = client.get(
+        ITEMS_URL, params={"owner_id": current_user_id, "fields": "title"}
+    ).json()
+    assert page["items"] == [{"title": "Item 0"}]
+    assert page["total"] == 1
+
+    me = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        params={"fields": "username"},
+        headers=auth_headers,
+    ).json()
+    assert list(me) == ["username"]
+
+    unknown = client.get(f"{ITEMS_URL}{item_id}", params={"fields": "title,secret"})
+    assert unknown.status_code == 400
+
+
+async def test_sparse_fieldsets_load_only_requested_columns(test_db_session):
+    """
+    Test only the requested columns (plus the version columns) are loaded
+    """
+    item = Item(title="Wide", description="x" * 1000, owner_id=1)
+    test_db_session.add(item)
+    await test_db_session.commit()
+    test_db_session.expunge_all()
+
+    loaded = await ItemService(test_db_session).get_by_id(item.id, ("title",))
+
+    assert inspect(loaded).unloaded == {
+        "description",
+        "owner_id",
+        "created_at",
+        "owner",
+    }
+
+
+def test_expand_owner_uses_fixed_query_count(
+    client: TestClient, auth_headers: dict, other_auth_headers: dict, test_db_session
+):
+    """
+    Test expand=owner embeds owner summaries loaded with one query per page
+    """
+    create_items(client, auth_headers, 3)
+    item_id = create_items(client, other_auth_headers, 3)[-1]
+
+    def query_count(response) -> int:
+        timing = response.headers["Server-Timing"]
+        return int(re.search(r'desc="(\d+) queries"', timing).group(1))
+
+    counts = []
+    for limit in (1, 6, 50):
+        # Start from an empty identity map so owners are never already loaded
+        test_db_session.expunge_all()
+        response = client.get(
+            ITEMS_URL, params={"mode": "cursor", "limit": limit, "expand": "owner"}
+        )
+        items = response.json()["items"]
+        assert len(items) >= min(limit, 6) and items[0]["owner"]["username"]
+        counts.append(query_count(response))
+
+    # One query for the page and one IN query for all of its owners
+    assert counts == [2, 2, 2]
+
+    test_db_session.expunge_all()
+    item = client.get(
+        f"{ITEMS_URL}{item_id}", params={"expand": "owner", "fields": "title"}
+    )
+    assert set(item.json()) == {"title", "owner"}
+    assert set(item.json()["owner"]) == {"id", "username", "full_name"}
+    assert query_count(item) == 2
+
+
+def test_owner_rename_refreshes_expanded_reads(
+    client: TestClient, auth_headers: dict, current_user_id: int
+):
+    """
+    Test renaming a user replaces cached expanded listings and changes their ETags
+    """
+    item_id = create_items(client, auth_headers, 1)[0]
+    item_url = f"{ITEMS_URL}{item_id}"
+    params = {"owner_id": current_user_id, "expand": "owner"}
+    page_etag = client.get(ITEMS_URL, params=params).headers["ETag"]
+    item_etag = client.get(item_url, params={"expand": "owner"}).headers["ETag"]
+
+    client.put(
+        f"{settings.API_V1_STR}/users/me",
+        json={"full_name": "Renamed Owner"},
+        headers=auth_headers,
+    )
+
+    page = client.get(ITEMS_URL, params=params, headers={"If-None-Match": page_etag})
+    assert page.status_code == 200
+    assert page.json()["items"][0]["owner"]["full_name"] == "Renamed Owner"
+
+    item = client.get(
+        item_url, params={"expand": "owner"}, headers={"If-None-Match": item_etag}
+    )
+    assert item.status_code == 200
+    assert item.json()["owner"]["full_name"] == "Renamed Owner"
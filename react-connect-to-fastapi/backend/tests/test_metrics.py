@@ -0,0 +1,114 @@
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.metrics import (
+    AGGREGATE_FILE,
+    fold_exited_snapshots,
+    merge_snapshots,
+    render_snapshot,
+)
+
+
+def test_metrics_endpoint(client: TestClient, auth_headers):
+    """
+    Test /metrics exposes requests by route template, pool gauges and errors
+    """
+    client.get(f"{settings.API_V1_STR}/items/123456789", headers=auth_headers)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert (
+        'http_requests_total{method="GET",route="/api/v1/items/{item_id}",'
+        'status="404"}' in body
+    )
+    assert 'http_request_duration_seconds_bucket{method="GET"' in body
+    assert 'app_exceptions_total{error_code="not_found"}' in body
+    assert 'db_pool_connections{pool="primary",state="size"}' in body
+    assert 'password_hash_duration_seconds_count{operation="hash"}' in body
+
+
+def test_merge_snapshots_drops_gauges_of_exited_workers():
+    """
+    Test counters and histograms are summed across workers, stale gauges dropped
+    """
+
+    def snapshot(pid, requests, in_flight):
+        return {
+            "pid": pid,
+            "metrics": {
+                "requests_total": {
+                    "type": "counter",
+                    "help": "Requests",
+                    "labelnames": ["route"],
+                    "samples": [[["/"], requests]],
+                },
+                "in_flight": {
+                    "type": "gauge",
+                    "help": "In flight",
+                    "labelnames": [],
+                    "samples": [[[], in_flight]],
+                },
+                "latency": {
+                    "type": "histogram",
+                    "help": "Latency",
+                    "labelnames": [],
+                    "buckets": [0.1],
+                    "samples": [[[], [1, 0, 0.05, 1]]],
+                },
+            },
+        }
+
+    # A pid far above pid_max never belongs to a live process
+    merged = merge_snapshots([snapshot(os.getpid(), 2, 1), snapshot(2**30, 3, 5)])
+    text = render_snapshot(merged)
+
+    assert 'requests_total{route="/"} 5' in text
+    assert "in_flight 1" in text
+    assert 'latency_bucket{le="0.1"} 2' in text
+    assert 'latency_bucket{le="+Inf"} 2' in text
+    assert "latency_count 2" in text
+
+
+def test_exited_worker_snapshots_are_folded(tmp_path):
+    """
+    Test snapshots of exited workers, including one whose pid was reused, are
+    folded into the aggregate file without losing counts
+    """
+
+    def write(pid, started_at, requests):
+        snapshot = {
+            "pid": pid,
+            "started_at": started_at,
+            "metrics": {
+                "requests_total": {
+                    "type": "counter",
+                    "help": "Requests",
+                    "labelnames": [],
+                    "samples": [[[], requests]],
+                },
+            },
+        }
+        path = tmp_path / f"metrics-{pid}-{started_at}.json"
+        path.write_text(json.dumps(snapshot))
+
+    write(2**30, 1, 3)
+    write(os.getpid(), 1, 4)
+    write(os.getpid(), 2, 1)
+
+    text = render_snapshot(merge_snapshots(fold_exited_snapshots(str(tmp_path))))
+    assert "requests_total 8" in text
+    assert {p.name for p in tmp_path.iterdir()} == {
+        AGGREGATE_FILE,
+        f"metrics-{os.getpid()}-2.json",
+    }
+
+    write(2**30, 5, 2)
+    text = render_snapshot(merge_snapshots(fold_exited_snapshots(str(tmp_path))))
+    assert "requests_total 10" in text
+    assert len(list(tmp_path.iterdir())) == 2
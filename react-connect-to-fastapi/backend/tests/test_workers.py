@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.errors import ServiceUnavailableError
+from app.core.workers import BoundedWorkerPool
+
+
+async def test_worker_pool_rejects_when_queue_is_full():
+    """
+    Test jobs beyond the worker and queue limits are rejected, not queued
+    """
+    pool = BoundedWorkerPool(name="test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+
+    assert pool.queue_depth == 1
+    with pytest.raises(ServiceUnavailableError):
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.gather(*running)
+
+    stats = pool.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["pending"] == 0
+    assert stats["queue_wait_max"] > 0
+    pool.shutdown()
+
+
+async def test_worker_pool_keeps_slot_of_cancelled_job():
+    """
+    Test a cancelled request does not free its slot while the job still runs
+    """
+    pool = BoundedWorkerPool(name="test", max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    running = asyncio.create_task(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+    running.cancel()
+    await asyncio.sleep(0.05)
+
+    assert pool.pending == 1
+    with pytest.raises(ServiceUnavailableError):
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.sleep(0.05)
+    assert pool.pending == 0
+    pool.shutdown()